@@ -0,0 +1,103 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+import config
+
+# Process-wide query result cache shared by all sessions. Entries are keyed
+# by (user_id, function, arguments, generation); every write for a user
+# bumps that user's generation, so stale entries are simply never hit again
+# and age out through LRU/TTL eviction.
+_entries = OrderedDict()
+_generations = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+def generation(user_id):
+    return _generations.get(user_id, 0)
+
+def invalidate_user(user_id):
+    with _lock:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+
+def _size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size_of(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size_of(v) for v in value)
+    return sys.getsizeof(value)
+
+def _copy(value):
+    # Callers are free to modify what they get back (add columns, parse
+    # dates), so never hand out the cached object itself
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+def _evict(key):
+    _, _, size = _entries.pop(key)
+    _stats['bytes'] -= size
+    _stats['evictions'] += 1
+
+def _store(key, value):
+    size = _size_of(value)
+    if size > config.CACHE_MAX_BYTES:
+        return
+    with _lock:
+        if key in _entries:
+            _stats['bytes'] -= _entries.pop(key)[2]
+        _entries[key] = (time.monotonic(), value, size)
+        _stats['bytes'] += size
+        while _stats['bytes'] > config.CACHE_MAX_BYTES or len(_entries) > config.CACHE_MAX_ENTRIES:
+            _evict(next(iter(_entries)))
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _stats['misses'] += 1
+            return None
+        if time.monotonic() - entry[0] > config.CACHE_TTL_S:
+            _evict(key)
+            _stats['misses'] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats['hits'] += 1
+        return entry
+
+def cached(func):
+    # Cache a read function whose first argument is the user id
+    @functools.wraps(func)
+    def wrapper(user_id, *args, **kwargs):
+        key = (user_id, func.__qualname__, args, tuple(sorted(kwargs.items())), generation(user_id))
+        entry = _lookup(key)
+        if entry is not None:
+            return _copy(entry[1])
+        value = func(user_id, *args, **kwargs)
+        _store(key, value)
+        return _copy(value)
+    return wrapper
+
+def cache_stats():
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return dict(
+            _stats,
+            entries=len(_entries),
+            hit_rate=_stats['hits'] / lookups if lookups else 0.0
+        )
+
+def clear_cache():
+    with _lock:
+        _entries.clear()
+        _stats['bytes'] = 0
@@ -1,41 +1,62 @@
-custom_css = """
-<style>
-    /* Main container */
-    .main {
-        background-color: #f8f9fa;
-    }
-    
-    /* Headers */
-    h1 {
-        color: #2c3e50;
-        border-bottom: 3px solid #3498db;
-        padding-bottom: 0.3em;
-    }
-    
-    /* Buttons */
-    .stButton>button {
-        background-color: #3498db;
-        color: white;
-        border-radius: 8px;
-        padding: 0.5em 2em;
-        transition: all 0.3s;
-    }
-    
-    .stButton>button:hover {
-        background-color: #2980b9;
-        transform: scale(1.05);
-    }
-    
-    /* Forms */
-    .stTextInput>div>div>input {
-        border-radius: 8px;
-        padding: 0.5em;
-    }
-    
-    /* Data editor */
-    .stDataFrame {
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-    }
-</style>
-"""
\ No newline at end of file
+# SQLite connection settings
+DATABASE = 'expense_tracker.db'
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT_S = 30
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KB = 16384
+
+# Query result cache
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ENTRIES = 1024
+CACHE_TTL_S = 300
+
+# Dashboard figures kept for reuse while their aggregate is unchanged
+FIGURE_CACHE_ENTRIES = 256
+
+# Most points per series a dashboard chart draws; longer ranges are drawn
+# in coarser buckets (bars) or downsampled (lines)
+CHART_MAX_POINTS = 120
+
+# Days of history the dashboard shows by default
+DASHBOARD_DEFAULT_DAYS = 365
+
+# Seconds between background passes that materialize recurring transactions
+RECURRING_INTERVAL_S = 3600
+
+# Exports stream rows from SQLite in chunks into a temp file that is kept
+# in memory up to the spool size and moved to disk beyond it
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+# Background writer: every write is queued (up to WRITE_QUEUE_SIZE) and
+# committed together with whatever else is queued, at most WRITE_GROUP_MAX
+# writes per transaction. A group window above 0 also waits that long for
+# more writes, which only pays off when commits are slow (synchronous=FULL).
+WRITE_QUEUE_SIZE = 1000
+WRITE_GROUP_WINDOW_MS = 0
+WRITE_GROUP_MAX = 256
+WRITE_TIMEOUT_S = 30
+
+# Password hashing: bcrypt cost (stored hashes with another cost are
+# upgraded on the next login), hashing threads, how many checks may be
+# running or waiting at once before logins are turned away, and how long a
+# login waits for its check
+BCRYPT_ROUNDS = 12
+BCRYPT_WORKERS = 2
+BCRYPT_MAX_PENDING = 16
+BCRYPT_TIMEOUT_S = 10
+VERIFY_CACHE_TTL_S = 600
+VERIFY_CACHE_MAX_ENTRIES = 1024
+
+# Failed logins allowed per username within the window before it is locked
+# out for the rest of the window, and how many usernames' failures are kept
+# (the least recently failed are forgotten first)
+LOGIN_MAX_FAILURES = 5
+LOGIN_FAILURE_WINDOW_S = 300
+LOGIN_TRACKED_USERNAMES = 10000
+
+# Rows per chunk (and per transaction) of the bulk importer
+IMPORT_CHUNK_ROWS = 50000
+
+# Theme used until a user picks one: "dark" or "light"
+THEME = 'dark'
@@ -0,0 +1,80 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import config
+
+_pool = queue.LifoQueue(maxsize=config.DB_POOL_SIZE)
+_created = 0
+_lock = threading.Lock()
+
+def _connect():
+    # Connections are handed between Streamlit script threads, so they must
+    # not be pinned to the thread that opened them
+    conn = sqlite3.connect(
+        config.DATABASE,
+        timeout=config.DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False
+    )
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA busy_timeout = {int(config.DB_BUSY_TIMEOUT_MS)}')
+    conn.execute(f'PRAGMA cache_size = -{int(config.DB_CACHE_SIZE_KB)}')
+    conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+def _acquire():
+    global _created
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        pass
+
+    with _lock:
+        if _created < config.DB_POOL_SIZE:
+            _created += 1
+            grow = True
+        else:
+            grow = False
+
+    if grow:
+        try:
+            return _connect()
+        except Exception:
+            with _lock:
+                _created -= 1
+            raise
+
+    # Pool is exhausted, wait for another session to hand one back
+    try:
+        return _pool.get(timeout=config.DB_POOL_TIMEOUT_S)
+    except queue.Empty:
+        raise sqlite3.OperationalError('timed out waiting for a pooled database connection')
+
+def _release(conn):
+    if conn.in_transaction:
+        conn.rollback()
+    _pool.put_nowait(conn)
+
+@contextmanager
+def get_connection():
+    conn = _acquire()
+    try:
+        # Commit on success, roll back on error, like sqlite3's own
+        # connection context manager
+        with conn:
+            yield conn
+    finally:
+        _release(conn)
+
+def close_all():
+    global _created
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            break
+        conn.close()
+        with _lock:
+            _created -= 1
@@ -0,0 +1,10 @@
+from dashboard_components.charts import display_chart, income_expense_bars, memoized
+
+@memoized
+def category_figure(category_data):
+    return income_expense_bars(category_data.index, category_data, 'Category-wise Income vs Expenses', 'Category')
+
+def display_category_analysis(category_data):
+    # category_data: income/expense totals in paise per category, from
+    # dashboard_data.load_dashboard_data
+    display_chart("Category Analysis", category_figure(category_data))
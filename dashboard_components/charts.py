@@ -0,0 +1,73 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import config
+from money import to_major
+
+INCOME_COLOR = '#2ecc71'
+EXPENSE_COLOR = '#e74c3c'
+
+# Figures shared by all sessions, keyed by the function that built them and
+# the content hash of the aggregate they were built from, so a panel whose
+# data hasn't changed reuses its figure instead of rebuilding it each rerun
+_figures = OrderedDict()
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+def content_hash(frame):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(frame.columns), frame.index.name, str(frame.index.dtype))).encode())
+    digest.update(pd.util.hash_pandas_object(frame).values.tobytes())
+    return digest.hexdigest()
+
+def memoized(build):
+    # For figure builders taking one aggregate frame; the returned figure is
+    # shared, so callers must not modify it
+    @functools.wraps(build)
+    def wrapper(frame):
+        key = (build.__module__, build.__qualname__, content_hash(frame))
+        with _lock:
+            figure = _figures.get(key)
+            if figure is not None:
+                _figures.move_to_end(key)
+                _stats['hits'] += 1
+                return figure
+            _stats['misses'] += 1
+        figure = build(frame)
+        with _lock:
+            _figures[key] = figure
+            while len(_figures) > config.FIGURE_CACHE_ENTRIES:
+                _figures.popitem(last=False)
+        return figure
+    return wrapper
+
+def figure_stats():
+    with _lock:
+        return dict(_stats, entries=len(_figures))
+
+def income_expense_bars(x, totals, title, xaxis_title):
+    # Grouped income/expense bars from a frame of paise totals
+    totals = to_major(totals)
+    figure = go.Figure()
+    figure.add_trace(go.Bar(x=x, y=totals['income'], name='Income', marker_color=INCOME_COLOR))
+    figure.add_trace(go.Bar(x=x, y=totals['expense'], name='Expenses', marker_color=EXPENSE_COLOR))
+    figure.update_layout(
+        barmode='group',
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title='Amount (₹)',
+        height=400
+    )
+    return figure
+
+def display_chart(title, figure):
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.subheader(title)
+    st.plotly_chart(figure, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
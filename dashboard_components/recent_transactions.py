@@ -0,0 +1,19 @@
+import streamlit as st
+
+from money import to_major
+
+def display_recent_transactions(recent):
+    # recent: this month's latest transactions from dashboard_data.load_dashboard_data
+    st.markdown('<div class="summary-card">', unsafe_allow_html=True)
+    st.subheader("Recent Transactions")
+    st.dataframe(
+        recent.assign(amount=to_major(recent['amount'])),
+        column_config={
+            "date": st.column_config.DateColumn("Date"),
+            "type": st.column_config.TextColumn("Type"),
+            "category": st.column_config.TextColumn("Category"),
+            "amount": st.column_config.NumberColumn("Amount", format="₹%.2f")
+        },
+        hide_index=True
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
@@ -0,0 +1,28 @@
+import plotly.graph_objects as go
+
+from dashboard_components.charts import EXPENSE_COLOR, display_chart, memoized
+from money import to_major
+
+@memoized
+def tag_figure(tag_data):
+    # Spending per tag, a transaction counts towards each of its tags
+    tag_data = to_major(tag_data)
+    fig_tag = go.Figure()
+    fig_tag.add_trace(go.Bar(
+        x=tag_data.index,
+        y=tag_data['expense'],
+        name='Expenses',
+        marker_color=EXPENSE_COLOR
+    ))
+    fig_tag.update_layout(
+        title='Spending by Tag',
+        xaxis_title='Tag',
+        yaxis_title='Amount (₹)',
+        height=400
+    )
+    return fig_tag
+
+def display_tag_analysis(tag_data):
+    # tag_data: income/expense totals in paise per tag from dashboard_data.load_dashboard_data
+    if not tag_data.empty:
+        display_chart("Tag Analysis", tag_figure(tag_data))
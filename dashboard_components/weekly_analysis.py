@@ -1,49 +1,15 @@
-import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+from dashboard_components.charts import display_chart, income_expense_bars, memoized
 
-def display_weekly_analysis(all_expenses):
-    st.markdown("""
-        <style>
-            .chart-container {
-                background-color: white;
-                border-radius: 10px;
-                padding: 20px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                margin-bottom: 20px;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
-    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-    st.subheader("Weekly Analysis")
-    
-    # Group by week and type
-    weekly_data = all_expenses.groupby([
-        pd.Grouper(key='date', freq='W'),
-        'type'
-    ])['amount'].sum().unstack().fillna(0)
-    
-    # Create weekly chart
-    fig_weekly = go.Figure()
-    fig_weekly.add_trace(go.Bar(
-        x=weekly_data.index,
-        y=weekly_data['income'],
-        name='Income',
-        marker_color='#2ecc71'
-    ))
-    fig_weekly.add_trace(go.Bar(
-        x=weekly_data.index,
-        y=weekly_data['expense'],
-        name='Expenses',
-        marker_color='#e74c3c'
-    ))
-    fig_weekly.update_layout(
-        barmode='group',
-        title='Weekly Income vs Expenses',
-        xaxis_title='Week',
-        yaxis_title='Amount (₹)',
-        height=400
-    )
-    st.plotly_chart(fig_weekly, use_container_width=True)
-    st.markdown('</div>', unsafe_allow_html=True) 
\ No newline at end of file
+# Titles per bucket of dashboard_data.load_period_data
+BUCKET_LABELS = {'week': 'Weekly', 'month': 'Monthly', 'quarter': 'Quarterly', 'year': 'Yearly'}
+
+@memoized
+def weekly_figure(weekly_data):
+    label = BUCKET_LABELS[weekly_data.index.name]
+    return income_expense_bars(weekly_data.index, weekly_data, f'{label} Income vs Expenses',
+                               weekly_data.index.name.title())
+
+def display_weekly_analysis(weekly_data):
+    # weekly_data: income/expense totals in paise per week, or per month,
+    # quarter or year for longer ranges, from dashboard_data.load_period_data
+    display_chart("Income vs Expenses", weekly_figure(weekly_data))
@@ -0,0 +1,9 @@
+from dashboard_components.charts import display_chart, income_expense_bars, memoized
+
+@memoized
+def yearly_figure(yearly_data):
+    return income_expense_bars(yearly_data.index.year, yearly_data, 'Yearly Income vs Expenses', 'Year')
+
+def display_yearly_analysis(yearly_data):
+    # yearly_data: yearly income/expense totals in paise from dashboard_data.load_dashboard_data
+    display_chart("Yearly Analysis", yearly_figure(yearly_data))
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import config
+from cache import cached
+from database import DATE_FORMAT, get_db
+
+TYPES = ['income', 'expense']
+
+# Every dashboard aggregate in one round trip, read from the rollup tables
+# maintained by rollups.py. Totals are integer paise. Rows are tagged with
+# the grain they belong to and split back apart in pandas, so only
+# O(periods + categories) rows are read.
+DASHBOARD_QUERY = '''
+    SELECT 'current' AS grain, NULL AS period, type, NULL AS category, SUM(total) AS total
+    FROM user_daily_totals
+    WHERE user_id = :user_id AND day >= :current_start AND day < :next_start
+    GROUP BY type
+    UNION ALL
+    SELECT 'previous', NULL, type, NULL, SUM(total)
+    FROM user_daily_totals
+    WHERE user_id = :user_id AND day >= :previous_start AND day < :current_start
+    GROUP BY type
+    UNION ALL
+    SELECT 'first', MIN(day), NULL, NULL, 0
+    FROM user_daily_totals
+    WHERE user_id = :user_id
+    UNION ALL
+    SELECT 'year', substr(month, 1, 4) || '-12-31', type, NULL, SUM(total)
+    FROM user_monthly_category_totals
+    WHERE user_id = :user_id
+    GROUP BY 2, type
+    UNION ALL
+    SELECT 'category', NULL, r.type, c.name, SUM(r.total)
+    FROM user_monthly_category_totals r JOIN categories c ON c.id = r.category_id
+    WHERE r.user_id = :user_id
+    GROUP BY r.category_id, r.type
+    UNION ALL
+    SELECT 'tag', NULL, e.type, t.name, SUM(e.amount)
+    FROM expenses e
+    JOIN transaction_tags tt ON tt.expense_id = e.id
+    JOIN tags t ON t.id = tt.tag_id
+    WHERE e.user_id = :user_id
+    GROUP BY tt.tag_id, e.type
+'''
+
+# Period end of a day for each bar chart bucket, finest first, with the
+# bucket's length in days
+BUCKETS = {
+    'week': ("date(day, 'weekday 0')", 7),
+    'month': ("date(day, 'start of month', '+1 month', '-1 day')", 30.44),
+    'quarter': ("date(day, 'start of month', '-' || ((CAST(strftime('%m', day) AS INTEGER) - 1) % 3) || ' months', "
+                "'+3 months', '-1 day')", 91.31),
+    'year': ("strftime('%Y', day) || '-12-31'", 365.25)
+}
+
+# Income/expense totals per bucket within [:start, :end], from the daily
+# rollup so only the selected window is read
+PERIOD_QUERY = '''
+    SELECT {bucket} AS period, type, SUM(total) AS total
+    FROM user_daily_totals
+    WHERE user_id = :user_id AND day >= :start AND day <= :end
+    GROUP BY 1, type
+'''
+
+MONTHLY_QUERY = '''
+    SELECT date(month || '-01', '+1 month', '-1 day') AS period, type, SUM(total) AS total
+    FROM user_monthly_category_totals
+    WHERE user_id = :user_id AND month >= substr(:start, 1, 7) AND month <= substr(:end, 1, 7)
+    GROUP BY 1, type
+'''
+
+def month_range(day):
+    # Half-open [start, end) bounds of the month containing `day`, as ISO
+    # strings, so the (user_id, date) index can serve month filters
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+def _totals(rows):
+    totals = rows.set_index('type')['total']
+    return {t: int(totals.get(t, 0)) for t in TYPES}
+
+def _period_frame(rows):
+    # Wide frame indexed by period end, the same shape pd.Grouper produced
+    frame = rows.pivot_table(index='period', columns='type', values='total', aggfunc='sum')
+    frame = frame.reindex(columns=TYPES).fillna(0).astype('int64')
+    frame.index = pd.to_datetime(frame.index, format=DATE_FORMAT)
+    return frame
+
+def _category_frame(rows):
+    # Also used for tags, which come back in the category column
+    frame = rows.pivot_table(index='category', columns='type', values='total', aggfunc='sum')
+    return frame.reindex(columns=TYPES).fillna(0).astype('int64')
+
+def choose_bucket(start, end, max_points=None):
+    # Finest bucket that keeps the window within max_points bars
+    days = (end - start).days + 1
+    for bucket, (_, length) in BUCKETS.items():
+        if days / length <= (max_points or config.CHART_MAX_POINTS):
+            return bucket
+    return bucket
+
+def lttb(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: indices of `threshold` points of the
+    # series (x ascending) that keep its visual shape. The first and last
+    # points are kept; from each bucket in between, the point forming the
+    # largest triangle with the previously kept point and the next bucket's
+    # average.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+def downsample(frame, max_points=None):
+    # Keep at most max_points rows of a period frame, sharing the budget
+    # between the series and keeping every row LTTB picks for any of them
+    max_points = max_points or config.CHART_MAX_POINTS
+    if len(frame) <= max_points:
+        return frame
+    x = frame.index.asi8
+    keep = set()
+    for column in frame.columns:
+        keep.update(lttb(x, frame[column].values, max_points // len(frame.columns)).tolist())
+    return frame.iloc[sorted(keep)]
+
+@cached
+def load_period_data(user_id, start, end):
+    # Bar chart totals bucketed to fit CHART_MAX_POINTS and the monthly
+    # trend downsampled to it, for the dates start..end. The bars' index
+    # is named after the bucket.
+    bucket = choose_bucket(start, end)
+    params = {'user_id': user_id, 'start': start.strftime(DATE_FORMAT), 'end': end.strftime(DATE_FORMAT)}
+    with get_db() as conn:
+        periods = _period_frame(pd.read_sql(PERIOD_QUERY.format(bucket=BUCKETS[bucket][0]), conn, params=params))
+        monthly = _period_frame(pd.read_sql(MONTHLY_QUERY, conn, params=params))
+    periods.index.name = bucket
+    return {'periods': periods, 'monthly': downsample(monthly)}
+
+@cached
+def load_dashboard_data(user_id, today=None):
+    today = today or datetime.now()
+    current_start, next_start = month_range(today)
+    previous_start, _ = month_range(today.replace(day=1) - timedelta(days=1))
+
+    with get_db() as conn:
+        rows = pd.read_sql(DASHBOARD_QUERY, conn, params={
+            'user_id': user_id,
+            'current_start': current_start,
+            'next_start': next_start,
+            'previous_start': previous_start
+        })
+        recent = pd.read_sql('''
+            SELECT e.date, e.type, c.name AS category, e.amount
+            FROM expenses e JOIN categories c ON c.id = e.category_id
+            WHERE e.user_id = ? AND e.date >= ? AND e.date < ?
+            ORDER BY e.date DESC
+            LIMIT 10
+        ''', conn, params=(user_id, current_start, next_start), parse_dates={'date': {'format': DATE_FORMAT}})
+
+    grains = {grain: group for grain, group in rows.groupby('grain')}
+    # Day of the user's first transaction, None without any
+    first = rows.loc[rows['grain'] == 'first', 'period'].iloc[0]
+    empty = rows.iloc[0:0]
+
+    return {
+        'current': _totals(grains.get('current', empty)),
+        'previous': _totals(grains.get('previous', empty)),
+        'first_day': datetime.strptime(first, DATE_FORMAT).date() if pd.notna(first) else None,
+        'yearly': _period_frame(grains.get('year', empty)),
+        'category': _category_frame(grains.get('category', empty)),
+        'tag': _category_frame(grains.get('tag', empty)),
+        'recent': recent
+    }
@@ -1,12 +1,38 @@
 import sqlite3
-import bcrypt
+import threading
 from datetime import datetime, timedelta
 import pandas as pd
 
-DATABASE = 'expense_tracker.db'
+from cache import cached, invalidate_user
+from connection import get_connection
+from writer import submit, write
+from passwords import hash_password, login_retry_after, needs_rehash, record_login, rehash_in_background, verify_password
+from money import to_minor
+from recurring import create_recurring_rules
+from lookups import LOOKUP_TABLES, TAGS_COLUMN, TRANSACTION_TAGS_TABLE, category_id, set_tags
+from rollups import ensure_rollups
+from search import create_search_index, match_query
+
+# Ids per statement for chunked IN (...) lists, well under SQLite's
+# default host parameter limit
+SQL_VARIABLE_CHUNK = 500
+
+_schema_ready = False
+_schema_lock = threading.Lock()
 
 def init_db():
-    conn = sqlite3.connect(DATABASE)
+    # Create and migrate the schema once per process; later calls (every
+    # script run) return without touching the database. Other sessions wait
+    # on the lock until the first one has finished.
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with get_connection() as conn:
+            _create_schema(conn)
+        _schema_ready = True
+
+def _create_schema(conn):
     c = conn.cursor()
     
     # Create users table
@@ -34,19 +60,178 @@ def init_db():
     ''')
     
     conn.commit()
-    conn.close()
+    
+    # Bring the schema up to date
+    migrate(conn)
+    
+    # Derived summary tables
+    conn.execute('BEGIN')
+    ensure_rollups(conn)
+    conn.commit()
+
+def _add_expense_indexes(conn):
+    # Every read is scoped to one user, usually ordered or bounded by date
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses (user_id, date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_type_date ON expenses (user_id, type, date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_category ON expenses (user_id, category)')
+
+ISO_DATE_GLOB = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+DATE_FORMAT = '%Y-%m-%d'
+
+def _normalize_expense_dates(conn):
+    # Rewrite legacy free-form dates as YYYY-MM-DD, which sorts and compares
+    # correctly as text and parses with a fixed format
+    rows = conn.execute(f"SELECT id, date FROM expenses WHERE date NOT GLOB '{ISO_DATE_GLOB}'").fetchall()
+    if rows:
+        ids, raw = zip(*rows)
+        parsed = pd.to_datetime(pd.Series(raw), format='mixed', errors='coerce')
+        updates = [(day.strftime(DATE_FORMAT), id_) for id_, day in zip(ids, parsed) if not pd.isna(day)]
+        conn.executemany('UPDATE expenses SET date = ? WHERE id = ?', updates)
+        if len(updates) < len(rows):
+            print(f"Warning: {len(rows) - len(updates)} expense dates could not be normalized")
+    
+    # Keep them that way
+    for event in ['INSERT', 'UPDATE OF date']:
+        name = event.split()[0].lower()
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS expenses_iso_date_{name} BEFORE {event} ON expenses
+            WHEN NEW.date NOT GLOB '{ISO_DATE_GLOB}'
+            BEGIN
+                SELECT RAISE(ABORT, 'expenses.date must be YYYY-MM-DD');
+            END
+        ''')
+
+def _rebuild_expenses(conn, create_sql, copy_sql, keep_sql=lambda sql: True):
+    # SQLite can't change a column's type in place, so copy expenses into a
+    # new table and re-create the indexes and triggers that were defined on
+    # the old one (those keep_sql accepts). Rollup triggers are left to
+    # rollups.ensure_rollups.
+    saved = conn.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = 'expenses' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+        AND name NOT LIKE 'expenses_rollup_%'
+    ''').fetchall()
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'expenses'").fetchone()
+    
+    conn.execute(create_sql)
+    conn.execute(copy_sql)
+    conn.execute('DROP TABLE expenses')
+    conn.execute('ALTER TABLE expenses_new RENAME TO expenses')
+    for (sql,) in saved:
+        if keep_sql(sql):
+            conn.execute(sql)
+    if sequence:
+        conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'expenses'", sequence)
+
+def _store_amounts_in_minor_units(conn):
+    # INTEGER amount column holding paise
+    _rebuild_expenses(conn, '''
+        CREATE TABLE expenses_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            tags TEXT,
+            recurring_rule_id INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (recurring_rule_id) REFERENCES recurring_rules (id)
+        )
+    ''', '''
+        INSERT INTO expenses_new (id, user_id, amount, category, description, date, type, tags, recurring_rule_id)
+        SELECT id, user_id, CAST(ROUND(amount * 100) AS INTEGER), category, description, date, type, tags, recurring_rule_id
+        FROM expenses
+    ''')
+    
+    # Recurring rules only feed new inserts; REAL holds whole paise exactly
+    conn.execute('UPDATE recurring_rules SET amount = ROUND(amount * 100)')
+
+def _encode_categories_and_tags(conn):
+    # Replace the category and comma-separated tags text on every expense
+    # with ids into the categories/tags dictionaries
+    for statement in LOOKUP_TABLES:
+        conn.execute(statement)
+    conn.execute('INSERT OR IGNORE INTO categories (name) SELECT DISTINCT category FROM expenses')
+    tagged = conn.execute("SELECT id, tags FROM expenses WHERE tags IS NOT NULL AND tags != ''").fetchall()
+    
+    _rebuild_expenses(conn, '''
+        CREATE TABLE expenses_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            amount INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            description TEXT,
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            recurring_rule_id INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (category_id) REFERENCES categories (id),
+            FOREIGN KEY (recurring_rule_id) REFERENCES recurring_rules (id)
+        )
+    ''', '''
+        INSERT INTO expenses_new (id, user_id, amount, category_id, description, date, type, recurring_rule_id)
+        SELECT e.id, e.user_id, e.amount, c.id, e.description, e.date, e.type, e.recurring_rule_id
+        FROM expenses e JOIN categories c ON c.name = e.category
+    ''', keep_sql=lambda sql: 'idx_expenses_user_category ' not in sql)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_category ON expenses (user_id, category_id)')
+    
+    conn.execute(TRANSACTION_TAGS_TABLE)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transaction_tags_tag ON transaction_tags (tag_id, expense_id)')
+    set_tags(conn, tagged)
+
+def _rollups_moved(conn):
+    # Version 2 used to create the rollup tables, which are now maintained
+    # by rollups.ensure_rollups
+    pass
+
+def _add_idempotency_keys(conn):
+    # Optional client-generated key per submission, unique per user, so a
+    # retried or double-clicked submit is recognised instead of saved twice.
+    # Added in place, without rebuilding expenses.
+    for table in ['expenses', 'recurring_rules']:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN idempotency_key TEXT')
+        conn.execute(f'''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_idempotency_key
+            ON {table} (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL
+        ''')
+
+# Schema migrations, applied in order. The position in this list (1-based)
+# is the schema version stored in PRAGMA user_version once it has run.
+MIGRATIONS = [
+    _add_expense_indexes,
+    _rollups_moved,
+    create_recurring_rules,
+    _normalize_expense_dates,
+    _store_amounts_in_minor_units,
+    _encode_categories_and_tags,
+    create_search_index,
+    _add_idempotency_keys,
+]
+
+def migrate(conn):
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.execute('BEGIN')
+            migration(conn)
+            conn.execute(f'PRAGMA user_version = {target}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
 def get_db():
-    return sqlite3.connect(DATABASE)
+    # Borrow a pooled connection, use as `with get_db() as conn:`
+    return get_connection()
 
 def create_user(username, password):
     try:
-        hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt())
-        with get_db() as conn:
-            conn.execute('''
-                INSERT INTO users (username, password) VALUES (?, ?)
-            ''', (username, hashed))
-            conn.commit()
+        hashed = hash_password(password)
+        write(lambda conn: conn.execute('''
+            INSERT INTO users (username, password) VALUES (?, ?)
+        ''', (username, hashed)))
         return True
     except sqlite3.IntegrityError:
         return False
@@ -55,75 +240,349 @@ def create_user(username, password):
         return False
 
 def authenticate_user(username, password):
+    # Returns the user id, or None for a wrong password, an unknown username
+    # or one locked out after too many failures (see login_retry_after)
     try:
+        if login_retry_after(username):
+            return None
         with get_db() as conn:
             user = conn.execute('''
                 SELECT id, password FROM users WHERE username = ?
             ''', (username,)).fetchone()
         
-        if user and bcrypt.checkpw(password.encode(), user[1]):
-            return user[0]  # Return user ID
-        return None
+        authenticated = bool(user) and verify_password(username, password, user[1])
+        record_login(username, authenticated)
+        if not authenticated:
+            return None
+        
+        if needs_rehash(user[1]):
+            # Upgrade to the configured cost without delaying the login
+            rehash_in_background(password, lambda hashed: submit(lambda conn: conn.execute(
+                'UPDATE users SET password = ? WHERE id = ? AND password = ?', (hashed, user[0], user[1])
+            )))
+        return user[0]  # Return user ID
     except Exception as e:
         print(f"Error authenticating user: {str(e)}")
         return None
 
-def add_transaction(user_id, amount, category, description, date, trans_type, tags=None):
+def add_transaction(user_id, amount, category, description, date, trans_type, tags=None, idempotency_key=None):
+    # Returns 'created', 'duplicate' when idempotency_key was already used by
+    # an earlier save (nothing is written), or False on error
+    def insert(conn):
+        cursor = conn.execute('''
+            INSERT INTO expenses (user_id, amount, category_id, description, date, type, idempotency_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING
+        ''', (user_id, to_minor(amount), category_id(conn, category), description, date.strftime('%Y-%m-%d')
+, trans_type, idempotency_key))
+        if cursor.rowcount == 0:
+            return 'duplicate'
+        set_tags(conn, [(cursor.lastrowid, tags)])
+        return 'created'
+
     try:
-        with get_db() as conn:
-            conn.execute('''
-                INSERT INTO expenses (user_id, amount, category, description, date, type, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, amount, category, description, date.strftime('%Y-%m-%d')
-, trans_type, tags))
-            conn.commit()
-        return True
+        return write(insert, after_commit=lambda outcome: invalidate_user(user_id))
     except Exception as e:
         print(f"Error adding transaction: {str(e)}")
         return False
 
-def get_transactions(user_id, start_date=None, end_date=None):
+TRANSACTION_TYPES = ['income', 'expense']
+
+# Select list of the transaction readers, resolving category and tag ids
+# back to names; callers append the WHERE/ORDER BY
+TRANSACTION_COLUMNS = f'''
+    SELECT e.id, e.date, e.type, c.name AS category, e.amount, e.description, {TAGS_COLUMN}
+    FROM expenses e JOIN categories c ON c.id = e.category_id
+'''
+
+def _typed_frame(df):
+    # Low-cardinality text columns as pandas categoricals
+    df['type'] = pd.Categorical(df['type'], categories=TRANSACTION_TYPES)
+    df['category'] = df['category'].astype('category')
+    return df
+
+def transaction_filters(user_id, start_date=None, end_date=None, trans_type=None,
+                         category=None, min_amount=None, max_amount=None, tag=None, search=None):
+    # WHERE clause over `expenses e` shared by the transaction list, its
+    # count and summary. Dates are inclusive, min_amount (rupees) is
+    # exclusive and max_amount inclusive.
+    clauses = ['user_id = ?']
+    params = [user_id]
+    
+    if start_date:
+        clauses.append('date >= ?')
+        params.append(str(start_date))
+    if end_date:
+        clauses.append('date <= ?')
+        params.append(str(end_date))
+    if trans_type:
+        clauses.append('type = ?')
+        params.append(trans_type)
+    if category:
+        clauses.append('category_id = (SELECT id FROM categories WHERE name = ?)')
+        params.append(category)
+    if min_amount is not None:
+        clauses.append('amount > ?')
+        params.append(to_minor(min_amount))
+    if max_amount is not None:
+        clauses.append('amount <= ?')
+        params.append(to_minor(max_amount))
+    if tag:
+        # Served by the (tag_id, expense_id) index on transaction_tags
+        clauses.append('''e.id IN (
+            SELECT tt.expense_id FROM transaction_tags tt
+            WHERE tt.tag_id = (SELECT id FROM tags WHERE name = ?)
+        )''')
+        params.append(tag)
+    if match_query(search):
+        clauses.append('e.id IN (SELECT rowid FROM expense_search WHERE expense_search MATCH ?)')
+        params.append(match_query(search))
+    
+    return ' WHERE ' + ' AND '.join(clauses), params
+
+# The cached readers raise on failure and the public functions below catch
+# it, so a failed read's fallback is never cached in place of real rows
+
+@cached
+def _read_transactions(user_id, start_date=None, end_date=None, limit=None, offset=0, search=None, **filters):
+    # With a search, matches come best first (FTS5 bm25 rank), otherwise
+    # newest first
+    with get_db() as conn:
+        where, params = transaction_filters(user_id, start_date, end_date, **filters)
+        if match_query(search):
+            query = (TRANSACTION_COLUMNS + ' JOIN expense_search(?) s ON s.rowid = e.id' + where
+                     + ' ORDER BY s.rank, e.date DESC, e.id DESC')
+            params.insert(0, match_query(search))
+        else:
+            query = TRANSACTION_COLUMNS + where + ' ORDER BY e.date DESC, e.id DESC'
+        
+        if limit is not None:
+            query += ' LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
+        
+        return _typed_frame(pd.read_sql(query, conn, params=params, parse_dates={'date': {'format': DATE_FORMAT}}))
+
+def get_transactions(user_id, start_date=None, end_date=None, limit=None, offset=0, search=None, **filters):
     try:
-        with get_db() as conn:
-            query = '''
-                SELECT id, date, type, category, amount, description, tags 
-                FROM expenses 
-                WHERE user_id = ?
-            '''
-            params = [user_id]
-            
-            if start_date and end_date:
-                query += ' AND date BETWEEN ? AND ?'
-                params.extend([start_date, end_date])
-            
-            query += ' ORDER BY date DESC'
-            
-            return pd.read_sql(query, conn, params=params)
+        return _read_transactions(user_id, start_date, end_date, limit, offset, search, **filters)
     except Exception as e:
         print(f"Error getting transactions: {str(e)}")
         return pd.DataFrame()
 
+@cached
+def _read_summary(user_id, start_date=None, end_date=None, **filters):
+    # Count, total and average (in paise) of the transactions matching the filters
+    with get_db() as conn:
+        where, params = transaction_filters(user_id, start_date, end_date, **filters)
+        count, total, average = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(amount), 0), COALESCE(AVG(amount), 0) FROM expenses e' + where,
+            params
+        ).fetchone()
+    return {'count': count, 'total': total, 'average': average}
+
+def summarize_transactions(user_id, start_date=None, end_date=None, **filters):
+    try:
+        return _read_summary(user_id, start_date, end_date, **filters)
+    except Exception as e:
+        print(f"Error summarizing transactions: {str(e)}")
+        return {'count': 0, 'total': 0, 'average': 0.0}
+
+@cached
+def _read_categories(user_id):
+    with get_db() as conn:
+        rows = conn.execute('''
+            SELECT name FROM categories
+            WHERE id IN (SELECT DISTINCT category_id FROM expenses WHERE user_id = ?)
+            ORDER BY name
+        ''', (user_id,)).fetchall()
+    return [row[0] for row in rows]
+
+def get_categories(user_id):
+    try:
+        return _read_categories(user_id)
+    except Exception as e:
+        print(f"Error getting categories: {str(e)}")
+        return []
+
+@cached
+def _read_tags(user_id):
+    with get_db() as conn:
+        rows = conn.execute('''
+            SELECT name FROM tags
+            WHERE id IN (
+                SELECT tt.tag_id
+                FROM expenses e JOIN transaction_tags tt ON tt.expense_id = e.id
+                WHERE e.user_id = ?
+            )
+            ORDER BY name
+        ''', (user_id,)).fetchall()
+    return [row[0] for row in rows]
+
+def get_tags(user_id):
+    try:
+        return _read_tags(user_id)
+    except Exception as e:
+        print(f"Error getting tags: {str(e)}")
+        return []
+
+@cached
+def _read_recent(user_id, n=5):
+    # Newest n transactions, read straight off the (user_id, date) index
+    with get_db() as conn:
+        return _typed_frame(pd.read_sql(
+            TRANSACTION_COLUMNS + ' WHERE user_id = ? ORDER BY e.date DESC, e.id DESC LIMIT ?',
+            conn, params=(user_id, n), parse_dates={'date': {'format': DATE_FORMAT}}
+        ))
+
+def recent_transactions(user_id, n=5):
+    try:
+        return _read_recent(user_id, n)
+    except Exception as e:
+        print(f"Error getting recent transactions: {str(e)}")
+        return pd.DataFrame()
+
+# after_commit callbacks for writer.write: drop cached reads only once the
+# write is visible to other connections
+
+def _invalidate_owner(owner):
+    if owner:
+        invalidate_user(owner[0])
+
+def _invalidate_if_changed(user_id):
+    def after_commit(changed):
+        if changed:
+            invalidate_user(user_id)
+    return after_commit
+
 def delete_transaction(transaction_id):
+    def delete(conn):
+        owner = conn.execute('SELECT user_id FROM expenses WHERE id = ?', (transaction_id,)).fetchone()
+        conn.execute('DELETE FROM expenses WHERE id = ?', (transaction_id,))
+        return owner
+
     try:
-        with get_db() as conn:
-            conn.execute('DELETE FROM expenses WHERE id = ?', (transaction_id,))
-            conn.commit()
+        write(delete, after_commit=_invalidate_owner)
         return True
     except Exception as e:
         print(f"Error deleting transaction: {str(e)}")
         return False
 
 def update_transaction(transaction_id, amount, category, description, date, trans_type, tags=None):
+    def update(conn):
+        owner = conn.execute('SELECT user_id FROM expenses WHERE id = ?', (transaction_id,)).fetchone()
+        conn.execute('''
+            UPDATE expenses 
+            SET amount = ?, category_id = ?, description = ?, date = ?, type = ?
+            WHERE id = ?
+        ''', (to_minor(amount), category_id(conn, category), description, date.strftime('%Y-%m-%d')
+, trans_type, transaction_id))
+        set_tags(conn, [(transaction_id, tags)])
+        return owner
+
     try:
-        with get_db() as conn:
-            conn.execute('''
-                UPDATE expenses 
-                SET amount = ?, category = ?, description = ?, date = ?, type = ?, tags = ?
-                WHERE id = ?
-            ''', (amount, category, description, date.strftime('%Y-%m-%d')
-, trans_type, tags, transaction_id))
-            conn.commit()
+        write(update, after_commit=_invalidate_owner)
         return True
     except Exception as e:
         print(f"Error updating transaction: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+TRANSACTION_FIELDS = ['amount', 'category', 'description', 'date', 'type', 'tags']
+
+def _normalize_edits(df):
+    # Plain objects, categoricals with different categories can't be compared
+    df = df.set_index('id')[TRANSACTION_FIELDS].astype({'category': object, 'type': object})
+    df['date'] = pd.to_datetime(df['date']).dt.strftime(DATE_FORMAT)
+    return df
+
+def _changed_rows(edited_df, original_df):
+    # Rows of the editor output that differ from what was loaded, treating
+    # NaN/None on both sides as equal
+    edited = _normalize_edits(edited_df)
+    original = _normalize_edits(original_df).reindex(edited.index)
+    differs = (edited != original) & ~(edited.isna() & original.isna())
+    return edited[differs.any(axis=1)]
+
+def _validation_error(row):
+    if pd.isna(row['amount']) or row['amount'] <= 0:
+        return 'amount must be positive'
+    if pd.isna(row['category']) or not row['category']:
+        return 'category is required'
+    if pd.isna(row['date']):
+        return 'date is required'
+    if row['type'] not in ('income', 'expense'):
+        return 'type must be income or expense'
+    return None
+
+def update_transactions(user_id, edited_df, original_df):
+    # Apply only the rows changed in the editor, in one transaction.
+    # Returns {transaction_id: outcome} for every changed row, where outcome
+    # is 'updated', 'not_found', 'failed' or a validation message.
+    changed = _changed_rows(edited_df, original_df)
+    outcomes = {}
+    params = []
+    for transaction_id, row in changed.iterrows():
+        error = _validation_error(row)
+        if error:
+            outcomes[transaction_id] = error
+            continue
+        params.append((
+            to_minor(row['amount']), row['category'],
+            None if pd.isna(row['description']) else row['description'],
+            row['date'], row['type'],
+            None if pd.isna(row['tags']) else row['tags'],
+            int(transaction_id), user_id
+        ))
+
+    if not params:
+        return outcomes
+
+    ids = [p[-2] for p in params]
+
+    def update(conn):
+        owned = set()
+        for i in range(0, len(ids), SQL_VARIABLE_CHUNK):
+            chunk = ids[i:i + SQL_VARIABLE_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            owned.update(r[0] for r in conn.execute(f'''
+                SELECT id FROM expenses WHERE user_id = ? AND id IN ({placeholders})
+            ''', [user_id] + chunk))
+
+        updates = [p for p in params if p[-2] in owned]
+        conn.executemany('''
+            UPDATE expenses 
+            SET amount = ?, category_id = ?, description = ?, date = ?, type = ?
+            WHERE id = ? AND user_id = ?
+        ''', [(amount, category_id(conn, category), description, date, trans_type, tid, uid)
+              for amount, category, description, date, trans_type, tags, tid, uid in updates])
+        set_tags(conn, [(p[-2], p[5]) for p in updates])
+        return owned
+
+    try:
+        owned = write(update, after_commit=_invalidate_if_changed(user_id))
+        for transaction_id in ids:
+            outcomes[transaction_id] = 'updated' if transaction_id in owned else 'not_found'
+    except Exception as e:
+        print(f"Error updating transactions: {str(e)}")
+        for p in params:
+            outcomes[p[-2]] = 'failed'
+    return outcomes
+
+def delete_transactions(user_id, transaction_ids):
+    # Delete many of a user's transactions in one transaction, in chunked
+    # IN (...) batches. Returns the number of rows deleted, or None on error.
+    ids = [int(transaction_id) for transaction_id in transaction_ids]
+    def delete(conn):
+        deleted = 0
+        for i in range(0, len(ids), SQL_VARIABLE_CHUNK):
+            chunk = ids[i:i + SQL_VARIABLE_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            deleted += conn.execute(f'''
+                DELETE FROM expenses WHERE user_id = ? AND id IN ({placeholders})
+            ''', [user_id] + chunk).rowcount
+        return deleted
+
+    try:
+        return write(delete, after_commit=_invalidate_if_changed(user_id))
+    except Exception as e:
+        print(f"Error deleting transactions: {str(e)}")
+        return None
@@ -0,0 +1,80 @@
+import argparse
+import csv
+import gzip
+import io
+import tempfile
+
+import config
+from connection import get_connection
+from database import TRANSACTION_COLUMNS, init_db, transaction_filters
+from money import format_major
+
+EXPORT_COLUMNS = ['id', 'date', 'type', 'category', 'amount', 'description', 'tags']
+
+def iter_transactions(user_id, chunk_size=None, conn=None, **filters):
+    # Yield the matching transactions, oldest first, as lists of at most
+    # chunk_size row tuples read off one cursor, so memory use doesn't grow
+    # with the size of the history. Reads on `conn` if given (e.g. inside
+    # the caller's read transaction), else on a pooled connection.
+    if conn is None:
+        with get_connection() as conn:
+            yield from iter_transactions(user_id, chunk_size, conn, **filters)
+        return
+    chunk_size = chunk_size or config.EXPORT_CHUNK_ROWS
+    where, params = transaction_filters(user_id, **filters)
+    cursor = conn.execute(TRANSACTION_COLUMNS + where + ' ORDER BY e.date, e.id', params)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield rows
+
+def write_csv(user_id, out, **filters):
+    # Write the matching transactions as CSV to the text stream `out`, with
+    # amounts in rupees. Returns the number of rows written.
+    writer = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for rows in iter_transactions(user_id, **filters):
+        writer.writerows(
+            (id_, date, trans_type, category, format_major(amount), description, tags)
+            for id_, date, trans_type, category, amount, description, tags in rows
+        )
+        count += len(rows)
+    return count
+
+def export_csv(user_id, compress=False, **filters):
+    # CSV export (gzipped if compress) in a spooled temp file, rewound and
+    # ready to read. The caller closes it. Returns None on error.
+    spool = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_BYTES)
+    try:
+        target = gzip.GzipFile(fileobj=spool, mode='wb') if compress else spool
+        text = io.TextIOWrapper(target, encoding='utf-8', newline='')
+        write_csv(user_id, text, **filters)
+        text.flush()
+        text.detach()
+        if compress:
+            # Writes the gzip trailer, leaving the spool open
+            target.close()
+        spool.seek(0)
+        return spool
+    except Exception as e:
+        spool.close()
+        print(f"Error exporting transactions: {str(e)}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a user's transactions as CSV")
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--output', '-o', required=True, help='CSV file to write')
+    parser.add_argument('--gzip', action='store_true', help='Compress the output')
+    args = parser.parse_args()
+
+    init_db()
+    opener = gzip.open if args.gzip else open
+    with opener(args.output, 'wt', encoding='utf-8', newline='') as out:
+        count = write_csv(args.user_id, out)
+    print(f'{count} transactions exported to {args.output}')
+
+if __name__ == '__main__':
+    main()
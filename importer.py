@@ -0,0 +1,238 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from cache import invalidate_user
+from connection import get_connection
+from database import DATE_FORMAT, TRANSACTION_TYPES, init_db
+from lookups import category_id, parse_tags, tag_id
+from rollups import ROLLUP_TRIGGER_NAMES, add_to_rollups
+from search import SEARCH_TRIGGER_NAMES, index_expenses
+
+# Header names accepted for each field, compared case-insensitively, so
+# that bank statements can be imported as downloaded
+COLUMN_ALIASES = {
+    'date': ['date', 'transaction date', 'txn date', 'value date', 'posting date'],
+    'description': ['description', 'narration', 'particulars', 'details', 'remarks', 'memo'],
+    'amount': ['amount', 'transaction amount'],
+    'debit': ['debit', 'debit amount', 'withdrawal', 'withdrawal amt.', 'withdrawal amount'],
+    'credit': ['credit', 'credit amount', 'deposit', 'deposit amt.', 'deposit amount'],
+    'type': ['type', 'transaction type'],
+    'category': ['category'],
+    'tags': ['tags']
+}
+
+TYPE_ALIASES = {
+    'income': 'income', 'credit': 'income', 'cr': 'income', 'deposit': 'income',
+    'expense': 'expense', 'debit': 'expense', 'dr': 'expense', 'withdrawal': 'expense'
+}
+
+DEFAULT_CATEGORIES = {'income': 'Other Income', 'expense': 'Other Expenses'}
+
+# Fields that identify a transaction when looking for duplicates
+FINGERPRINT_COLUMNS = ['date', 'type', 'category', 'amount', 'description']
+
+# Per-row triggers that are dropped while a chunk is inserted, and whose
+# work is then done once for the whole chunk: rollups by add_to_rollups,
+# the search index by index_expenses, and the ISO date check by the
+# validation below
+SUSPENDED_TRIGGERS = ROLLUP_TRIGGER_NAMES + SEARCH_TRIGGER_NAMES + ['expenses_iso_date_insert']
+
+def _column_map(headers):
+    names = {str(header).strip().lower(): header for header in headers}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names[alias]
+                break
+    if 'date' not in columns:
+        raise ValueError("No date column found")
+    if 'amount' not in columns and not ('debit' in columns or 'credit' in columns):
+        raise ValueError("No amount (or debit/credit) column found")
+    return columns
+
+def _dates(values, dayfirst):
+    # ISO dates first (dayfirst would misread them), then the format
+    # inferred from the first remaining value, then what's left one by one
+    dates = pd.to_datetime(values, format='ISO8601', errors='coerce')
+    for date_format in [None, 'mixed']:
+        retry = dates.isna() & (values != '')
+        if not retry.any():
+            break
+        dates[retry] = pd.to_datetime(values[retry], format=date_format, dayfirst=dayfirst, errors='coerce')
+    return dates.dt.strftime(DATE_FORMAT)
+
+def _amounts(values):
+    # " ₹1,234.50" -> 1234.5, NaN when empty or not a number
+    return pd.to_numeric(values.str.replace(r'[,\s₹]', '', regex=True), errors='coerce')
+
+def normalize(chunk, columns, dayfirst=False):
+    # Validate and normalize a chunk of raw (string) rows. Returns the valid
+    # rows as date/type/category/amount (paise)/description/tags, and the
+    # reason each invalid row was rejected, both indexed like the chunk.
+    def field(name, strip=False):
+        if name not in columns:
+            return pd.Series('', index=chunk.index)
+        values = chunk[columns[name]].fillna('')
+        return values.str.strip() if strip else values
+
+    rows = pd.DataFrame(index=chunk.index)
+    rows['date'] = _dates(field('date'), dayfirst)
+
+    if 'amount' in columns:
+        amount = _amounts(field('amount'))
+        # Signed amounts: money out is negative unless a type column says otherwise
+        signed = pd.Series(np.where(amount < 0, 'expense', 'income'), index=chunk.index)
+        trans_type = field('type', strip=True).str.lower().map(TYPE_ALIASES) if 'type' in columns else signed
+    else:
+        debit, credit = _amounts(field('debit')), _amounts(field('credit'))
+        is_debit = debit.fillna(0) != 0
+        amount = debit.where(is_debit, credit)
+        trans_type = pd.Series(np.where(is_debit, 'expense', 'income'), index=chunk.index)
+    rows['type'] = trans_type
+    amount = amount.abs()
+    rows['amount'] = np.rint(amount.fillna(0) * 100).astype('int64')
+
+    rows['category'] = field('category', strip=True)
+    missing_category = rows['category'] == ''
+    rows.loc[missing_category, 'category'] = rows.loc[missing_category, 'type'].map(DEFAULT_CATEGORIES)
+    rows['description'] = field('description', strip=True)
+    rows['tags'] = field('tags')
+
+    reasons = pd.Series(None, index=chunk.index, dtype=object)
+    reasons[~rows['type'].isin(TRANSACTION_TYPES)] = 'type must be income or expense'
+    reasons[amount.isna() | (rows['amount'] <= 0)] = 'amount must be a positive number'
+    reasons[rows['date'].isna()] = 'date could not be parsed'
+    invalid = reasons.notna()
+    return rows[~invalid], reasons[invalid]
+
+def fingerprints(rows):
+    # 64-bit hash of each row's identifying fields
+    return pd.util.hash_pandas_object(rows[FINGERPRINT_COLUMNS].astype({'amount': 'int64'}), index=False)
+
+def _existing_fingerprints(conn, user_id):
+    # How many times each fingerprint already occurs in the user's history
+    existing = pd.read_sql('''
+        SELECT e.date, e.type, c.name AS category, e.amount, COALESCE(e.description, '') AS description
+        FROM expenses e JOIN categories c ON c.id = e.category_id
+        WHERE e.user_id = ?
+    ''', conn, params=(user_id,))
+    return fingerprints(existing).value_counts()
+
+def insert_chunk(conn, user_id, rows):
+    # Insert the rows (date/type/category/amount/description/tags, valid
+    # and normalized) with consecutive ids in one write transaction, with
+    # the per-row triggers suspended, then update rollups and the search
+    # index for the whole id range at once
+    conn.execute('BEGIN IMMEDIATE')
+    first_id = conn.execute('''
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'expenses'), 0),
+                   COALESCE((SELECT MAX(id) FROM expenses), 0)) + 1
+    ''').fetchone()[0]
+    # In date order, so the (user_id, date) indexes are appended to in runs
+    rows = rows.sort_values('date', kind='stable')
+    ids = np.arange(first_id, first_id + len(rows))
+    categories = {name: category_id(conn, name) for name in rows['category'].unique()}
+
+    triggers = conn.execute(f'''
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'trigger' AND name IN ({','.join('?' * len(SUSPENDED_TRIGGERS))})
+    ''', SUSPENDED_TRIGGERS).fetchall()
+    for name, _ in triggers:
+        conn.execute(f'DROP TRIGGER {name}')
+
+    conn.executemany('''
+        INSERT INTO expenses (id, user_id, amount, category_id, description, date, type)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', zip(ids.tolist(), [user_id] * len(rows), rows['amount'].tolist(),
+             rows['category'].map(categories).tolist(), rows['description'].tolist(),
+             rows['date'].tolist(), rows['type'].tolist()))
+
+    tagged = [(int(expense_id), parse_tags(tags))
+              for expense_id, tags in zip(ids, rows['tags']) if tags]
+    tag_ids = {name: tag_id(conn, name) for name in {name for _, names in tagged for name in names}}
+    conn.executemany('INSERT INTO transaction_tags (expense_id, tag_id) VALUES (?, ?)', [
+        (expense_id, tag_ids[name]) for expense_id, names in tagged for name in names
+    ])
+
+    add_to_rollups(conn, first_id)
+    index_expenses(conn, first_id)
+    for _, sql in triggers:
+        conn.execute(sql)
+    conn.commit()
+
+def import_csv(user_id, source, dayfirst=False, chunk_rows=None, progress=None):
+    # Stream a CSV or bank statement (path or file) into the user's expenses
+    # in chunks of chunk_rows, one transaction each. Rows already in the
+    # user's history (same date, type, category, amount and description,
+    # counting repeats) are skipped, so re-running an import is safe.
+    # progress, if given, is called with the running summary after every
+    # chunk. Returns the summary, or None on error.
+    summary = {'read': 0, 'imported': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'rows_per_s': 0.0}
+    started = time.monotonic()
+    try:
+        reader = pd.read_csv(source, dtype=str, keep_default_na=False, skipinitialspace=True,
+                             chunksize=chunk_rows or config.IMPORT_CHUNK_ROWS)
+        with get_connection() as conn:
+            existing = _existing_fingerprints(conn, user_id)
+            seen = pd.Series(dtype='int64')
+            columns = None
+            for chunk in reader:
+                columns = columns or _column_map(chunk.columns)
+                rows, reasons = normalize(chunk, columns, dayfirst)
+                # First 100 rejected rows, by line number in the file
+                summary['errors'].extend(
+                    (index + 2, reason) for index, reason in reasons.items()
+                    if len(summary['errors']) < 100
+                )
+
+                # The n-th copy of a row is a duplicate if the history
+                # already has n or more of them
+                prints = fingerprints(rows)
+                occurrence = prints.groupby(prints).cumcount() + prints.map(seen).fillna(0)
+                duplicate = occurrence < prints.map(existing).fillna(0)
+                seen = seen.add(prints.value_counts(), fill_value=0)
+
+                new_rows = rows[~duplicate.values]
+                if len(new_rows):
+                    insert_chunk(conn, user_id, new_rows)
+                    invalidate_user(user_id)
+
+                summary['read'] += len(chunk)
+                summary['imported'] += len(new_rows)
+                summary['duplicates'] += int(duplicate.sum())
+                summary['invalid'] += len(reasons)
+                summary['rows_per_s'] = summary['read'] / max(time.monotonic() - started, 1e-9)
+                if progress:
+                    progress(summary)
+        return summary
+    except Exception as e:
+        print(f"Error importing transactions: {str(e)}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import a CSV or bank statement')
+    parser.add_argument('path', help='CSV file to import')
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--dayfirst', action='store_true', help='Dates are DD/MM/YYYY')
+    args = parser.parse_args()
+
+    init_db()
+    summary = import_csv(
+        args.user_id, args.path, dayfirst=args.dayfirst,
+        progress=lambda s: print(f"{s['read']} rows read, {s['imported']} imported "
+                                 f"({s['rows_per_s']:,.0f} rows/s)")
+    )
+    if summary is None:
+        raise SystemExit(1)
+    for line, reason in summary['errors']:
+        print(f'Line {line}: {reason}')
+    print(f"{summary['imported']} imported, {summary['duplicates']} duplicates skipped, "
+          f"{summary['invalid']} invalid")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+import argparse
+import importlib.util
+import itertools
+import os
+import tempfile
+
+import pandas as pd
+
+import config
+from cache import invalidate_user
+from connection import get_connection
+from database import TRANSACTION_TYPES, init_db
+from export import iter_transactions
+from importer import insert_chunk
+from lookups import parse_tags
+
+# Columnar backups of a user's ledger as Parquet or Arrow IPC files, one row
+# group / record batch per export chunk. pyarrow is optional and only
+# imported when one of these functions runs.
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet/Arrow support needs pyarrow (pip install pyarrow)")
+    return pyarrow
+
+def available():
+    # Whether pyarrow is installed, without importing it
+    return importlib.util.find_spec('pyarrow') is not None
+
+def ledger_schema(pa, user_id=None, username=None):
+    # Amounts stay integer paise; type and category are dictionary encoded
+    # like the lookup tables they come from, with one dictionary for the
+    # whole file (Arrow IPC files can't replace it between batches). The
+    # user is the same for every row, so it's file metadata, not a column.
+    metadata = {'amount_unit': 'paise'}
+    if user_id is not None:
+        metadata.update(user_id=str(user_id), username=username or '')
+    return pa.schema([
+        ('id', pa.int64()),
+        ('date', pa.date32()),
+        ('type', pa.dictionary(pa.int8(), pa.string())),
+        ('category', pa.dictionary(pa.int32(), pa.string())),
+        ('amount', pa.int64()),
+        ('description', pa.string()),
+        ('tags', pa.list_(pa.string()))
+    ], metadata=metadata)
+
+def _format_of(path, fmt=None):
+    fmt = fmt or next((name for name, suffix in FORMATS.items() if str(path).endswith(suffix)), None)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown ledger format for {path}, expected one of {', '.join(FORMATS)}")
+    return fmt
+
+def _encode(pa, values, dictionary, index_type):
+    # Encode against a fixed dictionary, the same for every batch
+    positions = {value: i for i, value in enumerate(dictionary)}
+    return pa.DictionaryArray.from_arrays(
+        pa.array([positions[value] for value in values], index_type),
+        pa.array(dictionary, pa.string())
+    )
+
+def _batch(pa, schema, rows, category_names):
+    ids, dates, types, categories, amounts, descriptions, tags = zip(*rows)
+    return pa.RecordBatch.from_arrays([
+        pa.array(ids, pa.int64()),
+        pa.array(dates, pa.string()).cast(pa.date32()),
+        _encode(pa, types, TRANSACTION_TYPES, schema.field('type').type.index_type),
+        _encode(pa, categories, category_names, schema.field('category').type.index_type),
+        pa.array(amounts, pa.int64()),
+        pa.array(descriptions, pa.string()),
+        pa.array([parse_tags(t) for t in tags], pa.list_(pa.string()))
+    ], schema=schema)
+
+def export_ledger(user_id, out, fmt=None, **filters):
+    # Write the user's transactions (all of them unless filtered) to `out`,
+    # a path or binary file. A path is written through a temp file next to
+    # it and only replaced once the export is complete. Returns the number
+    # of rows written, or None on error.
+    temp_path = None
+    try:
+        pa = _pyarrow()
+        fmt = _format_of(getattr(out, 'name', out), fmt)
+        target = out
+        if isinstance(out, (str, os.PathLike)):
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out)),
+                                             prefix='.' + os.path.basename(out), suffix='.tmp')
+            os.close(fd)
+            target = temp_path
+        count = 0
+        with get_connection() as conn:
+            # One read snapshot for the user, the category dictionary and
+            # the rows
+            conn.execute('BEGIN')
+            user = conn.execute('SELECT username FROM users WHERE id = ?', (user_id,)).fetchone()
+            if user is None:
+                raise ValueError(f"No user with id {user_id}")
+            category_names = [name for name, in conn.execute('SELECT name FROM categories ORDER BY id')]
+            schema = ledger_schema(pa, user_id, user[0])
+            if fmt == 'parquet':
+                writer = pa.parquet.ParquetWriter(target, schema, compression='zstd')
+            else:
+                writer = pa.ipc.new_file(target, schema)
+            with writer:
+                for rows in iter_transactions(user_id, conn=conn, **filters):
+                    writer.write_batch(_batch(pa, schema, rows, category_names))
+                    count += len(rows)
+        if temp_path:
+            os.replace(temp_path, out)
+            temp_path = None
+        return count
+    except Exception as e:
+        print(f"Error exporting ledger: {str(e)}")
+        return None
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def ledger_file(user_id, fmt, **filters):
+    # Export into a spooled temp file, rewound and ready to read. The caller
+    # closes it. Returns None on error.
+    spool = tempfile.SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_BYTES)
+    if export_ledger(user_id, spool, fmt, **filters) is None:
+        spool.close()
+        return None
+    spool.seek(0)
+    return spool
+
+def _read_batches(pa, source, fmt):
+    # Batches of at most IMPORT_CHUNK_ROWS rows. Paths are memory mapped, so
+    # the batches reference the file's pages instead of being copied onto
+    # the heap
+    size = config.IMPORT_CHUNK_ROWS
+    if fmt == 'parquet':
+        yield from pa.parquet.ParquetFile(source, memory_map=isinstance(source, str)).iter_batches(batch_size=size)
+    else:
+        if isinstance(source, str):
+            source = pa.memory_map(source)
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, size):
+                yield batch.slice(offset, size)
+
+def _ledger_rows(pa, source, fmt):
+    # Rows of a ledger file in the shape iter_transactions yields them,
+    # with tags as lists
+    for batch in _read_batches(pa, source, fmt):
+        columns = [batch.column(name) for name in ['id', 'date', 'type', 'category', 'amount', 'description', 'tags']]
+        columns[1] = columns[1].cast(pa.string())
+        yield from zip(*[column.to_pylist() for column in columns])
+
+def verify_ledger(user_id, source, fmt=None, **filters):
+    # Compare a ledger file with the user's transactions (as filtered when
+    # exported) row by row; returns the ids that differ or are missing on
+    # either side (empty list when they match)
+    pa = _pyarrow()
+    fmt = _format_of(getattr(source, 'name', source), fmt)
+    expected = (
+        (id_, date[:10], trans_type, category, amount, description, parse_tags(tags))
+        for rows in iter_transactions(user_id, **filters)
+        for id_, date, trans_type, category, amount, description, tags in rows
+    )
+    return [
+        (ours or theirs)[0]
+        for ours, theirs in itertools.zip_longest(expected, _ledger_rows(pa, source, fmt))
+        if ours != theirs
+    ]
+
+def import_ledger(user_id, source, fmt=None):
+    # Append the transactions in a ledger file (path or binary file) to the
+    # user's expenses, one write transaction per chunk like the CSV
+    # importer; ids are reassigned. Returns the number of rows imported, or
+    # None on error (chunks before the error stay imported).
+    try:
+        pa = _pyarrow()
+        fmt = _format_of(getattr(source, 'name', source), fmt)
+        count = 0
+        with get_connection() as conn:
+            for batch in _read_batches(pa, source, fmt):
+                columns = {name: batch.column(name) for name in batch.schema.names}
+                missing = {'date', 'type', 'category', 'amount'} - set(columns)
+                if missing:
+                    raise ValueError(f"Ledger is missing columns: {', '.join(sorted(missing))}")
+                rows = pd.DataFrame({
+                    'date': columns['date'].cast(pa.date32()).cast(pa.string()).to_pylist(),
+                    'type': columns['type'].cast(pa.string()).to_pylist(),
+                    'category': columns['category'].cast(pa.string()).to_pylist(),
+                    'amount': columns['amount'].cast(pa.int64()).to_pylist(),
+                    'description': (columns['description'].to_pylist() if 'description' in columns
+                                    else [None] * batch.num_rows),
+                    'tags': [', '.join(tags) if tags else '' for tags in
+                             (columns['tags'].to_pylist() if 'tags' in columns else [None] * batch.num_rows)]
+                })
+                unknown = set(rows['type']) - set(TRANSACTION_TYPES)
+                if unknown:
+                    raise ValueError(f"Unknown transaction types: {', '.join(map(str, unknown))}")
+                if rows['date'].isna().any() or rows['category'].isna().any() or rows['amount'].isna().any():
+                    raise ValueError("Ledger has rows without a date, category or amount")
+                if len(rows):
+                    insert_chunk(conn, user_id, rows)
+                    invalidate_user(user_id)
+                count += len(rows)
+        return count
+    except Exception as e:
+        print(f"Error importing ledger: {str(e)}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, import or verify a user's ledger as Parquet or Arrow")
+    parser.add_argument('command', choices=['export', 'import', 'verify'])
+    parser.add_argument('path', help='Ledger file (.parquet or .arrow)')
+    parser.add_argument('--user-id', type=int, required=True)
+    parser.add_argument('--format', choices=list(FORMATS), default=None,
+                        help='File format, by default taken from the file extension')
+    args = parser.parse_args()
+
+    init_db()
+    if args.command == 'verify':
+        # Checks an export of the user's full history against the database
+        mismatched = verify_ledger(args.user_id, args.path, args.format)
+        if mismatched:
+            print(f'{len(mismatched)} transactions differ, first ids: {mismatched[:10]}')
+            raise SystemExit(1)
+        print('Ledger matches the database')
+        return
+    if args.command == 'export':
+        count = export_ledger(args.user_id, args.path, args.format)
+    else:
+        count = import_ledger(args.user_id, args.path, args.format)
+    if count is None:
+        raise SystemExit(1)
+    print(f'{count} transactions {args.command}ed')
+
+if __name__ == '__main__':
+    main()
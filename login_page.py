@@ -1,111 +1,8 @@
 import streamlit as st
 from database import create_user, authenticate_user
+from passwords import login_retry_after
 
 def auth_page():
-    st.markdown("""
-        <style>
-            .auth-container {
-                max-width: 400px;
-                margin: 0 auto;
-                padding: 30px;
-                border-radius: 15px;
-                box-shadow: 0 8px 16px rgba(0, 0, 0, 0.3);
-                background: linear-gradient(145deg, #2d2d2d 0%, #1a1a1a 100%);
-                border: 1px solid #404040;
-            }
-            .auth-title {
-                text-align: center;
-                color: #ffffff;
-                margin-bottom: 30px;
-                font-size: 2em;
-                font-weight: bold;
-                background: linear-gradient(45deg, #6c5ce7, #a29bfe);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-            }
-            .auth-subtitle {
-                text-align: center;
-                color: #a29bfe;
-                margin-bottom: 30px;
-                font-size: 1.1em;
-            }
-            .auth-form {
-                padding: 20px;
-            }
-            .auth-input {
-                margin-bottom: 20px;
-            }
-            .auth-button {
-                width: 100%;
-                padding: 12px;
-                border-radius: 8px;
-                font-weight: bold;
-                margin-top: 20px;
-                transition: all 0.3s ease;
-            }
-            .auth-button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 4px 8px rgba(0, 0, 0, 0.3);
-            }
-            .auth-message {
-                text-align: center;
-                margin-top: 20px;
-                padding: 15px;
-                border-radius: 8px;
-                font-weight: 500;
-            }
-            .success-message {
-                background: linear-gradient(145deg, #2d3436 0%, #1a1a1a 100%);
-                border: 1px solid #00b894;
-                color: #00b894;
-            }
-            .error-message {
-                background: linear-gradient(145deg, #2d3436 0%, #1a1a1a 100%);
-                border: 1px solid #e57373;
-                color: #e57373;
-            }
-            .auth-footer {
-                text-align: center;
-                margin-top: 30px;
-                color: #a29bfe;
-                font-size: 0.9em;
-            }
-            .auth-tabs {
-                margin-bottom: 30px;
-            }
-            .stTabs [data-baseweb="tab-list"] {
-                gap: 50px;
-            }
-            .stTabs [data-baseweb="tab"] {
-                padding: 10px 20px;
-                font-size: 1.1em;
-                font-weight: 500;
-            }
-            .password-requirements {
-                font-size: 0.85em;
-                color: #a29bfe;
-                margin-top: 5px;
-                padding: 10px;
-                background-color: #2d2d2d;
-                border-radius: 5px;
-                border: 1px solid #404040;
-            }
-            .password-requirements ul {
-                margin: 5px 0;
-                padding-left: 20px;
-            }
-            .password-requirements li {
-                margin-bottom: 5px;
-            }
-            .password-requirements .valid {
-                color: #00b894;
-            }
-            .password-requirements .invalid {
-                color: #e57373;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
     # Create tabs for Login and Register
     tab1, tab2 = st.tabs(["🔑 Login", "📝 Register"])
     
@@ -140,6 +37,8 @@ def auth_page():
                         st.session_state.user_id = user_id
                         st.session_state.username = username
                         st.rerun()
+                    elif login_retry_after(username):
+                        st.error(f"Too many failed attempts, try again in {login_retry_after(username)} seconds")
                     else:
                         st.error("Invalid credentials")
         
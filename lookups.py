@@ -0,0 +1,63 @@
+# Dictionary tables for the repeated strings on expenses: each category and
+# tag name is stored once and expenses refer to it by integer id
+LOOKUP_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    )
+    '''
+]
+
+TRANSACTION_TAGS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS transaction_tags (
+        expense_id INTEGER NOT NULL REFERENCES expenses (id) ON DELETE CASCADE,
+        tag_id INTEGER NOT NULL REFERENCES tags (id),
+        PRIMARY KEY (expense_id, tag_id)
+    ) WITHOUT ROWID
+'''
+
+# Comma-separated tag names of an expense `e`, for readers that still
+# present tags as one editable text field
+TAGS_COLUMN = '''
+    (SELECT group_concat(t.name, ', ')
+     FROM transaction_tags tt JOIN tags t ON t.id = tt.tag_id
+     WHERE tt.expense_id = e.id) AS tags
+'''
+
+def _lookup_id(conn, table, name):
+    conn.execute(f'INSERT OR IGNORE INTO {table} (name) VALUES (?)', (name,))
+    return conn.execute(f'SELECT id FROM {table} WHERE name = ?', (name,)).fetchone()[0]
+
+def category_id(conn, name):
+    return _lookup_id(conn, 'categories', name)
+
+def tag_id(conn, name):
+    return _lookup_id(conn, 'tags', name)
+
+def parse_tags(tags):
+    # "work, Travel,work" -> ['work', 'Travel'], dropping blanks and repeats
+    if not isinstance(tags, str):
+        return []
+    names = []
+    for name in (part.strip() for part in tags.split(',')):
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def set_tags(conn, expense_tags):
+    # Replace the tags of each (expense_id, tags string) pair
+    expense_tags = list(expense_tags)
+    conn.executemany('DELETE FROM transaction_tags WHERE expense_id = ?',
+                     [(expense_id,) for expense_id, _ in expense_tags])
+    conn.executemany('INSERT OR IGNORE INTO transaction_tags (expense_id, tag_id) VALUES (?, ?)', [
+        (expense_id, tag_id(conn, name))
+        for expense_id, tags in expense_tags
+        for name in parse_tags(tags)
+    ])
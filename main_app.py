@@ -1,200 +1,27 @@
+import hashlib
+import uuid
 import pandas as pd
 import streamlit as st
-import bcrypt
-from database import init_db, get_db, create_user, authenticate_user, add_transaction, get_transactions, delete_transaction, update_transaction
-from helper import display_dashboard
-from config import custom_css
+from database import init_db, get_db, create_user, authenticate_user, add_transaction, get_transactions, delete_transaction, update_transaction, update_transactions, delete_transactions, summarize_transactions, get_categories, get_tags, recent_transactions
+import config
 from datetime import datetime, timedelta
-from dashboard_components.metrics import display_metrics
-from dashboard_components.weekly_analysis import display_weekly_analysis
-from dashboard_components.monthly_analysis import display_monthly_analysis
 from login_page import auth_page
+from money import format_amount, to_major
+from recurring import add_recurring_rule, start_scheduler
+from theme import THEMES, apply_theme
 
 # Initialize database
 try:
     init_db()
+    # Materialize recurring transactions now and then periodically
+    start_scheduler()
 except Exception as e:
     st.error(f"Error initializing database: {str(e)}")
     st.stop()
 
-# Custom CSS for better styling
-st.markdown("""
-    <style>
-        /* Main background and container styles */
-        .stApp {
-            background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%);
-            color: #ffffff;
-        }
-        
-        .main-container {
-            background: linear-gradient(145deg, #2d2d2d 0%, #1a1a1a 100%);
-            border-radius: 15px;
-            padding: 20px;
-            margin: 10px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-            border: 1px solid #404040;
-        }
-        
-        /* Auth page styles */
-        .auth-container {
-            max-width: 400px;
-            margin: 0 auto;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 8px 16px rgba(0, 0, 0, 0.3);
-            background: linear-gradient(145deg, #2d2d2d 0%, #1a1a1a 100%);
-            border: 1px solid #404040;
-        }
-        
-        .auth-title {
-            text-align: center;
-            color: #ffffff;
-            margin-bottom: 30px;
-            font-size: 2em;
-            font-weight: bold;
-            background: linear-gradient(45deg, #6c5ce7, #a29bfe);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        /* Transaction form styles */
-        .transaction-container {
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 8px 16px rgba(0, 0, 0, 0.3);
-            background: linear-gradient(145deg, #2d2d2d 0%, #1a1a1a 100%);
-            border: 1px solid #404040;
-        }
-        
-        .transaction-title {
-            text-align: center;
-            color: #ffffff;
-            margin-bottom: 30px;
-            background: linear-gradient(45deg, #6c5ce7, #a29bfe);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        /* Button styles */
-        .stButton > button {
-            background: linear-gradient(45deg, #6c5ce7, #a29bfe);
-            color: white;
-            border: none;
-            border-radius: 8px;
-            padding: 10px 20px;
-            font-weight: bold;
-            transition: all 0.3s ease;
-        }
-        
-        .stButton > button:hover {
-            background: linear-gradient(45deg, #a29bfe, #6c5ce7);
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.3);
-        }
-        
-        /* Input field styles */
-        .stTextInput > div > div > input,
-        .stNumberInput > div > div > input,
-        .stSelectbox > div > div > div {
-            background-color: #2d2d2d;
-            border: 1px solid #404040;
-            border-radius: 8px;
-            padding: 8px 12px;
-            transition: all 0.3s ease;
-            color: #ffffff;
-        }
-        
-        .stTextInput > div > div > input:focus,
-        .stNumberInput > div > div > input:focus,
-        .stSelectbox > div > div > div:focus {
-            border-color: #6c5ce7;
-            box-shadow: 0 0 0 2px rgba(108, 92, 231, 0.3);
-        }
-        
-        /* Card styles */
-        .summary-card {
-            background: linear-gradient(145deg, #2d2d2d 0%, #1a1a1a 100%);
-            border-radius: 10px;
-            padding: 20px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-            border: 1px solid #404040;
-            transition: all 0.3s ease;
-        }
-        
-        .summary-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 6px 12px rgba(0, 0, 0, 0.4);
-        }
-        
-        /* Table styles */
-        .stDataFrame {
-            background-color: #2d2d2d;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-            border: 1px solid #404040;
-        }
-        
-        /* Sidebar styles */
-        .css-1d391kg {
-            background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%);
-            color: white;
-            border-right: 1px solid #404040;
-        }
-        
-        /* Success and error message styles */
-        .stAlert {
-            border-radius: 10px;
-            padding: 15px;
-            margin: 10px 0;
-        }
-        
-        .stAlert.success {
-            background: linear-gradient(145deg, #2d3436 0%, #1a1a1a 100%);
-            border: 1px solid #00b894;
-            color: #00b894;
-        }
-        
-        .stAlert.error {
-            background: linear-gradient(145deg, #2d3436 0%, #1a1a1a 100%);
-            border: 1px solid #e57373;
-            color: #e57373;
-        }
-        
-        /* Password requirements */
-        .password-requirements .valid {
-            color: #00b894;
-        }
-        
-        .password-requirements .invalid {
-            color: #e57373;
-        }
-
-        /* Text color for better readability */
-        .stMarkdown, .stText, .stNumberInput > label, .stTextInput > label, .stSelectbox > label {
-            color: #ffffff !important;
-        }
-
-        /* Radio button styles */
-        .stRadio > div {
-            background-color: #2d2d2d;
-            border-radius: 8px;
-            padding: 10px;
-            border: 1px solid #404040;
-        }
-
-        /* Checkbox styles */
-        .stCheckbox > div {
-            background-color: #2d2d2d;
-            border-radius: 8px;
-            padding: 10px;
-            border: 1px solid #404040;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
 def main():
+    # Styles for every page, sent to the browser once per session
+    apply_theme(st.session_state.get('theme', config.THEME))
     st.title("💰 Personal Expense Tracker")
     
     if 'logged_in' not in st.session_state:
@@ -210,69 +37,36 @@ def main_app_page():
     st.sidebar.header(f"Welcome, {st.session_state.username}!")
     
     # Navigation
-    page = st.sidebar.radio("Menu", ["📊 Dashboard", "💸 Add Transaction", "✂️ Manage Transactions"])
+    page = st.sidebar.radio("Menu", ["📊 Dashboard", "💸 Add Transaction", "✂️ Manage Transactions", "📥 Import Transactions"])
     
+    themes = [name.title() for name in THEMES]
+    theme = st.sidebar.radio(
+        "Theme", themes, horizontal=True,
+        index=themes.index(st.session_state.get('theme', config.THEME).title())
+    ).lower()
+    st.session_state['theme'] = theme
+    apply_theme(theme)
+
     if st.sidebar.button("🚪 Logout"):
         st.session_state.logged_in = False
         st.rerun()
     
     try:
+        # Page modules are imported on first visit, so plotly is only
+        # loaded once someone opens the dashboard
         if page == "📊 Dashboard":
+            from helper import display_dashboard
             display_dashboard(user_id) # type: ignore
         elif page == "💸 Add Transaction":
             add_transaction_form(user_id)
         elif page == "✂️ Manage Transactions":
             manage_transactions(user_id)
+        elif page == "📥 Import Transactions":
+            import_transactions(user_id)
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
 
 def add_transaction_form(user_id):
-    st.markdown("""
-        <style>
-            .transaction-container {
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 20px;
-                border-radius: 10px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-                background-color: #ffffff;
-            }
-            .transaction-title {
-                text-align: center;
-                color: #2c3e50;
-                margin-bottom: 30px;
-            }
-            .transaction-form {
-                padding: 20px;
-            }
-            .transaction-button {
-                width: 100%;
-                margin-top: 20px;
-            }
-            .category-select {
-                margin-bottom: 20px;
-            }
-            .amount-input {
-                margin-bottom: 20px;
-            }
-            .date-picker {
-                margin-bottom: 20px;
-            }
-            .description-box {
-                margin-bottom: 20px;
-            }
-            .tags-input {
-                margin-bottom: 20px;
-            }
-            .recurring-section {
-                background-color: #f8f9fa;
-                padding: 15px;
-                border-radius: 8px;
-                margin-bottom: 20px;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
     st.markdown('<div class="transaction-container">', unsafe_allow_html=True)
     st.markdown('<h2 class="transaction-title">💸 Add New Transaction</h2>', unsafe_allow_html=True)
     
@@ -410,12 +204,40 @@ def add_transaction_form(user_id):
         # Submit button
         submit_button = st.form_submit_button("💾 Save Transaction", use_container_width=True)
         
+        if not submit_button:
+            # Filling in a new transaction; a repeated submit of the same
+            # form (double click) keeps the nonce and so the key below
+            st.session_state.pop('transaction_nonce', None)
+        
         if submit_button:
             if not amount or not category or not date:
                 st.error("Please fill in all required fields")
             else:
-                if add_transaction(user_id, amount, category, description, date, trans_type, tags):
+                nonce = st.session_state.setdefault('transaction_nonce', uuid.uuid4().hex)
+                idempotency_key = hashlib.sha256(repr((
+                    nonce, trans_type, amount, category, description, str(date), tags,
+                    is_recurring, str(end_date) if is_recurring else None, recurrence if is_recurring else None
+                )).encode()).hexdigest()
+                if is_recurring:
+                    saved = add_recurring_rule(
+                        user_id, amount, category, description,
+                        date, end_date, recurrence, trans_type, tags,
+                        idempotency_key=idempotency_key
+                    )
+                else:
+                    saved = add_transaction(
+                        user_id, amount, category, description, date, trans_type, tags,
+                        idempotency_key=idempotency_key
+                    )
+                if saved in ('created', 'duplicate'):
+                    # The next submit is a new transaction, even with the same
+                    # values; only a re-send of this submit (a double click
+                    # interrupting this run before here) reuses the key
+                    st.session_state['transaction_nonce'] = uuid.uuid4().hex
+                if saved == 'created':
                     st.success("Transaction saved successfully!")
+                elif saved == 'duplicate':
+                    st.info("This transaction was already saved")
                 else:
                     st.error("Failed to save transaction")
     
@@ -424,10 +246,11 @@ def add_transaction_form(user_id):
     # Add recent transactions preview with better styling
     st.markdown("### 📝 Recent Transactions")
     try:
-        recent_transactions = get_transactions(user_id).head(5)
-        if not recent_transactions.empty:
+        recent = recent_transactions(user_id, 5)
+        if not recent.empty:
+            recent['amount'] = to_major(recent['amount'])
             st.dataframe(
-                recent_transactions,
+                recent,
                 column_config={
                     "date": st.column_config.DateColumn("Date"),
                     "type": st.column_config.TextColumn("Type"),
@@ -443,49 +266,28 @@ def add_transaction_form(user_id):
     except Exception as e:
         st.error(f"Failed to load recent transactions: {str(e)}")
 
+EXPORT_FILES = {
+    "CSV": ("transactions.csv", "text/csv"),
+    "CSV (gzip)": ("transactions.csv.gz", "application/gzip"),
+    "Parquet": ("transactions.parquet", "application/vnd.apache.parquet"),
+    "Arrow": ("transactions.arrow", "application/vnd.apache.arrow.file")
+}
+
 def manage_transactions(user_id):
-    st.markdown("""
-        <style>
-            .manage-container {
-                max-width: 1200px;
-                margin: 0 auto;
-                padding: 20px;
-            }
-            .filter-section {
-                background-color: #f8f9fa;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-            }
-            .transaction-table {
-                background-color: white;
-                border-radius: 10px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                padding: 20px;
-            }
-            .summary-card {
-                background-color: white;
-                border-radius: 10px;
-                padding: 15px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                margin-bottom: 20px;
-            }
-        </style>
-    """, unsafe_allow_html=True)
-    
     st.markdown('<div class="manage-container">', unsafe_allow_html=True)
     st.markdown('<h2 class="transaction-title">✂️ Manage Transactions</h2>', unsafe_allow_html=True)
     
     try:
-        expenses = get_transactions(user_id)
+        categories = get_categories(user_id)
         
-        if not expenses.empty:
-            # Convert date column to datetime
-            expenses['date'] = pd.to_datetime(expenses['date'],format='mixed')
-            
+        if categories:
             # Filter section
             st.markdown('<div class="filter-section">', unsafe_allow_html=True)
-            col1, col2, col3, col4 = st.columns(4)
+            search = st.text_input(
+                "🔍 Search",
+                placeholder="Search descriptions, categories and tags"
+            )
+            col1, col2, col3, col4, col5 = st.columns(5)
             
             with col1:
                 date_range = st.selectbox(
@@ -504,7 +306,7 @@ def manage_transactions(user_id):
             with col3:
                 category_filter = st.selectbox(
                     "Category",
-                    ["All"] + sorted(expenses['category'].unique().tolist()),
+                    ["All"] + categories,
                     index=0
                 )
             
@@ -515,58 +317,84 @@ def manage_transactions(user_id):
                     index=0
                 )
             
+            with col5:
+                tag_filter = st.selectbox(
+                    "Tag",
+                    ["All"] + get_tags(user_id),
+                    index=0
+                )
+            
             st.markdown('</div>', unsafe_allow_html=True)
             
-            # Apply filters
-            filtered_expenses = expenses.copy()
+            # Translate filters into query arguments, applied in SQL
+            filters = {}
             
             if date_range != "All Time":
-                today = datetime.now()
-                if date_range == "Last 7 Days":
-                    filtered_expenses = filtered_expenses[filtered_expenses['date'] >= today - timedelta(days=7)]
-                elif date_range == "Last 30 Days":
-                    filtered_expenses = filtered_expenses[filtered_expenses['date'] >= today - timedelta(days=30)]
-                elif date_range == "Last 3 Months":
-                    filtered_expenses = filtered_expenses[filtered_expenses['date'] >= today - timedelta(days=90)]
-                elif date_range == "Last Year":
-                    filtered_expenses = filtered_expenses[filtered_expenses['date'] >= today - timedelta(days=365)]
+                days = {"Last 7 Days": 7, "Last 30 Days": 30, "Last 3 Months": 90, "Last Year": 365}[date_range]
+                filters['start_date'] = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
             
             if transaction_type != "All":
-                filtered_expenses = filtered_expenses[filtered_expenses['type'] == transaction_type.lower()]
+                filters['trans_type'] = transaction_type.lower()
             
             if category_filter != "All":
-                filtered_expenses = filtered_expenses[filtered_expenses['category'] == category_filter]
+                filters['category'] = category_filter
+            
+            if tag_filter != "All":
+                filters['tag'] = tag_filter
+            
+            # Full-text matches, best first
+            if search.strip():
+                filters['search'] = search.strip()
             
             if amount_range != "All":
-                if amount_range == "0-100":
-                    filtered_expenses = filtered_expenses[filtered_expenses['amount'] <= 100]
-                elif amount_range == "100-500":
-                    filtered_expenses = filtered_expenses[(filtered_expenses['amount'] > 100) & (filtered_expenses['amount'] <= 500)]
-                elif amount_range == "500-1000":
-                    filtered_expenses = filtered_expenses[(filtered_expenses['amount'] > 500) & (filtered_expenses['amount'] <= 1000)]
-                elif amount_range == "1000+":
-                    filtered_expenses = filtered_expenses[filtered_expenses['amount'] > 1000]
+                filters['min_amount'], filters['max_amount'] = {
+                    "0-100": (None, 100),
+                    "100-500": (100, 500),
+                    "500-1000": (500, 1000),
+                    "1000+": (1000, None)
+                }[amount_range]
+            
+            summary = summarize_transactions(user_id, **filters)
             
             # Summary cards
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.markdown('<div class="summary-card">', unsafe_allow_html=True)
-                total_amount = filtered_expenses['amount'].sum()
-                st.metric("Total Amount", f"₹{total_amount:.2f}")
+                total_amount = summary['total']
+                st.metric("Total Amount", format_amount(total_amount))
                 st.markdown('</div>', unsafe_allow_html=True)
             
             with col2:
                 st.markdown('<div class="summary-card">', unsafe_allow_html=True)
-                avg_amount = filtered_expenses['amount'].mean()
-                st.metric("Average Amount", f"₹{avg_amount:.2f}")
+                avg_amount = summary['average']
+                st.metric("Average Amount", format_amount(round(avg_amount)))
                 st.markdown('</div>', unsafe_allow_html=True)
             
             with col3:
                 st.markdown('<div class="summary-card">', unsafe_allow_html=True)
-                transaction_count = len(filtered_expenses)
+                transaction_count = summary['count']
                 st.metric("Number of Transactions", transaction_count)
                 st.markdown('</div>', unsafe_allow_html=True)
             
+            # Pagination, only the visible page is loaded
+            col1, col2 = st.columns(2)
+            with col1:
+                page_size = st.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+            with col2:
+                page_count = max(1, -(-transaction_count // page_size))
+                page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+            
+            filtered_expenses = get_transactions(
+                user_id,
+                limit=page_size,
+                offset=(page - 1) * page_size,
+                **filters
+            )
+            # Edit amounts in rupees
+            filtered_expenses['amount'] = to_major(filtered_expenses['amount'])
+            # Any of the user's categories can be picked in the editor
+            filtered_expenses['category'] = filtered_expenses['category'].cat.set_categories(categories)
+            
             # Transaction table
             st.markdown('<div class="transaction-table">', unsafe_allow_html=True)
             st.subheader("Transactions")
@@ -580,14 +408,14 @@ def manage_transactions(user_id):
                     "id": None,
                     "date": st.column_config.DateColumn("Date"),
                     "type": st.column_config.SelectboxColumn("Type", options=["income", "expense"]),
-                    "category": st.column_config.SelectboxColumn("Category", 
-                            options=sorted(expenses['category'].unique().tolist())),
+                    "category": st.column_config.SelectboxColumn("Category", options=categories),
                     "amount": st.column_config.NumberColumn("Amount", format="₹%.2f"),
                     "description": st.column_config.TextColumn("Description"),
                     "tags": st.column_config.TextColumn("Tags"),
                     "Delete": st.column_config.CheckboxColumn("Delete", default=False)
                 },
-                key="expense_editor",
+                # Separate edit state per page and filter combination
+                key=f"expense_editor_{hash((tuple(sorted(filters.items())), page, page_size))}",
                 hide_index=True
             )
             
@@ -595,33 +423,39 @@ def manage_transactions(user_id):
             with col1:
                 if st.button("💾 Save Changes", use_container_width=True):
                     try:
-                        for index, row in edited_df.iterrows():
-                            if not row['Delete']:  # Only update non-deleted rows
-                                if update_transaction(
-                                    row['id'],
-                                    row['amount'],
-                                    row['category'],
-                                    row['description'],
-                                    row['date'],
-                                    row['type'],
-                                    row['tags']
-                                ):
-                                    st.success("Transactions updated successfully!")
-                                else:
-                                    st.error("Failed to update some transactions")
+                        # Only update non-deleted rows that were actually edited
+                        outcomes = update_transactions(
+                            user_id,
+                            edited_df[~edited_df['Delete']],
+                            filtered_expenses
+                        )
+                        updated = sum(1 for outcome in outcomes.values() if outcome == 'updated')
+                        failed = {tid: outcome for tid, outcome in outcomes.items() if outcome != 'updated'}
+                        if not outcomes:
+                            st.info("No changes to save")
+                        elif not failed:
+                            st.success(f"Updated {updated} transaction(s) successfully!")
+                        else:
+                            st.error(f"Updated {updated} transaction(s), {len(failed)} failed")
+                            st.dataframe(
+                                pd.DataFrame(
+                                    [(tid, outcome) for tid, outcome in failed.items()],
+                                    columns=["Transaction", "Problem"]
+                                ),
+                                hide_index=True
+                            )
                     except Exception as e:
                         st.error(f"Failed to update transactions: {str(e)}")
             
             with col2:
                 if st.button("🗑️ Delete Selected", use_container_width=True):
                     try:
-                        for index, row in edited_df.iterrows():
-                            if row['Delete']:  # Delete selected rows
-                                if delete_transaction(row['id']):
-                                    st.success("Selected transactions deleted successfully!")
-                                else:
-                                    st.error("Failed to delete some transactions")
-                        st.rerun()  # Refresh the page to show updated data
+                        selected_ids = edited_df.loc[edited_df['Delete'], 'id'].tolist()
+                        deleted = delete_transactions(user_id, selected_ids)
+                        if deleted is None:
+                            st.error("Failed to delete the selected transactions")
+                        else:
+                            st.rerun()  # Refresh the page to show updated data
                     except Exception as e:
                         st.error(f"Failed to delete transactions: {str(e)}")
             
@@ -629,16 +463,37 @@ def manage_transactions(user_id):
             
             # Export options
             st.markdown("### 📤 Export Data")
-            col1, col2 = st.columns(2)
+            import ledger
+            from export import export_csv
+            formats = ["CSV", "CSV (gzip)"] + (["Parquet", "Arrow"] if ledger.available() else [])
+            col1, col2, col3 = st.columns(3)
             with col1:
-                if st.button("📥 Export to CSV", use_container_width=True):
-                    csv = filtered_expenses.to_csv(index=False)
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv,
-                        file_name="transactions.csv",
-                        mime="text/csv"
-                    )
+                export_scope = st.radio("Export", ["Current filters", "Entire history"], horizontal=True)
+            with col2:
+                export_format = st.selectbox("Format", formats)
+            export_filters = filters if export_scope == "Current filters" else {}
+            with col3:
+                if st.button("📥 Export", use_container_width=True):
+                    # Rows are streamed from the database into a temp file,
+                    # only the finished file is read back. The bytes go
+                    # straight to the download button and are not kept in
+                    # session_state, so they are freed on the next rerun.
+                    if export_format.startswith("CSV"):
+                        export = export_csv(user_id, compress=export_format == "CSV (gzip)", **export_filters)
+                    else:
+                        export = ledger.ledger_file(user_id, export_format.lower(), **export_filters)
+                    if export is None:
+                        st.error("Failed to export transactions")
+                    else:
+                        file_name, mime = EXPORT_FILES[export_format]
+                        with export:
+                            st.download_button(
+                                label=f"Download {export_format}",
+                                data=export.read(),
+                                file_name=file_name,
+                                mime=mime,
+                                use_container_width=True
+                            )
             
         else:
             st.info("No transactions found")
@@ -647,5 +502,50 @@ def manage_transactions(user_id):
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def import_transactions(user_id):
+    st.markdown('<h2 class="transaction-title">📥 Import Transactions</h2>', unsafe_allow_html=True)
+    st.write(
+        "Upload a CSV or bank statement with a date column and an amount (or debit/credit) column, "
+        "optionally with type, category, description and tags. Rows already in your history are skipped."
+    )
+    
+    import ledger
+    from importer import import_csv
+    
+    file_types = ["csv"] + (["parquet", "arrow"] if ledger.available() else [])
+    uploaded = st.file_uploader("File", type=file_types)
+    dayfirst = st.checkbox("Dates are day first (DD/MM/YYYY)", value=True)
+    
+    if uploaded is not None and st.button("📥 Import", use_container_width=True):
+        if not uploaded.name.lower().endswith(".csv"):
+            # Parquet/Arrow ledger exported from this app
+            count = ledger.import_ledger(user_id, uploaded)
+            if count is None:
+                st.error("Failed to import the ledger")
+            else:
+                st.success(f"Imported {count} transaction(s)")
+            return
+        
+        progress_bar = st.progress(0.0, text="Importing...")
+        
+        def report(summary):
+            progress_bar.progress(
+                min(uploaded.tell() / max(uploaded.size, 1), 1.0),
+                text=f"{summary['read']:,} rows read, {summary['imported']:,} imported "
+                     f"({summary['rows_per_s']:,.0f} rows/s)"
+            )
+        
+        summary = import_csv(user_id, uploaded, dayfirst=dayfirst, progress=report)
+        if summary is None:
+            st.error("Failed to import transactions")
+            return
+        progress_bar.progress(1.0, text=f"{summary['read']:,} rows read")
+        st.success(
+            f"Imported {summary['imported']} transaction(s), skipped {summary['duplicates']} duplicate(s) "
+            f"and {summary['invalid']} invalid row(s)"
+        )
+        if summary['errors']:
+            st.dataframe(pd.DataFrame(summary['errors'], columns=["Line", "Problem"]), hide_index=True)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,21 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+# Amounts are stored and aggregated as integer minor units (paise), and only
+# converted to rupees for display and editing
+MINOR_PER_MAJOR = 100
+
+def to_minor(amount):
+    # Exact rupees -> paise, going through the decimal string so 0.29
+    # becomes 29 rather than 28.999...
+    return int((Decimal(str(amount)) * MINOR_PER_MAJOR).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def to_major(minor):
+    # Works on ints, Series and DataFrames alike
+    return minor / MINOR_PER_MAJOR
+
+def format_major(minor):
+    # Exact rupees as text, 123456 -> "1234.56"
+    return str(Decimal(int(minor)).scaleb(-2))
+
+def format_amount(minor):
+    return f"₹{format_major(minor)}"
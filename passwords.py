@@ -0,0 +1,118 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+import config
+
+# bcrypt runs on a small dedicated pool (it releases the GIL while hashing),
+# so a burst of logins uses at most BCRYPT_WORKERS cores and never blocks
+# other sessions' script threads. A job holds one of BCRYPT_MAX_PENDING
+# slots until it finishes; requests finding none free are turned away
+# instead of queueing without bound.
+_pool = ThreadPoolExecutor(max_workers=config.BCRYPT_WORKERS, thread_name_prefix='bcrypt')
+_slots = threading.BoundedSemaphore(config.BCRYPT_MAX_PENDING)
+
+# Recent successful logins, keyed by an HMAC (with a per-process secret) of
+# username, password and stored hash, so repeat logins skip bcrypt
+_secret = os.urandom(32)
+_verified = OrderedDict()
+
+# Failed login times per username, least recently failed first
+_failures = OrderedDict()
+_lock = threading.Lock()
+
+def _submit(func, *args):
+    # The slot is released when the job is done, not when the caller stops
+    # waiting for it, so abandoned jobs still count against the limit
+    if not _slots.acquire(blocking=False):
+        raise TimeoutError('too many password checks in progress')
+    try:
+        future = _pool.submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+def _run(func, *args):
+    return _submit(func, *args).result(timeout=config.BCRYPT_TIMEOUT_S)
+
+def _hash(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS))
+
+def hash_password(password):
+    return _run(_hash, password)
+
+def needs_rehash(hashed):
+    # "$2b$12$..." -> hashed with a cost other than BCRYPT_ROUNDS
+    return int(hashed.split(b'$')[2]) != config.BCRYPT_ROUNDS
+
+def _cache_key(username, password, hashed):
+    return hmac.new(_secret, b'\0'.join([username.encode(), password.encode(), hashed]), hashlib.sha256).digest()
+
+def verify_password(username, password, hashed):
+    key = _cache_key(username, password, hashed)
+    with _lock:
+        expires = _verified.get(key)
+        if expires is not None and expires > time.monotonic():
+            return True
+    if not _run(bcrypt.checkpw, password.encode(), hashed):
+        return False
+    with _lock:
+        _verified[key] = time.monotonic() + config.VERIFY_CACHE_TTL_S
+        _verified.move_to_end(key)
+        while len(_verified) > config.VERIFY_CACHE_MAX_ENTRIES:
+            _verified.popitem(last=False)
+    return True
+
+def rehash_in_background(password, on_hashed):
+    # Hash with the current cost on the pool and pass the new hash to
+    # on_hashed, without making the caller wait. Skipped when the pool is
+    # busy; the next login tries again.
+    def done(future):
+        try:
+            on_hashed(future.result())
+        except Exception as e:
+            print(f"Error rehashing password: {str(e)}")
+    try:
+        _submit(_hash, password).add_done_callback(done)
+    except TimeoutError:
+        pass
+
+def _recent_failures(username, now):
+    failures = _failures.get(username)
+    while failures and failures[0] <= now - config.LOGIN_FAILURE_WINDOW_S:
+        failures.popleft()
+    return failures
+
+def login_retry_after(username):
+    # Seconds until the username may try again, 0 if it isn't locked out
+    now = time.monotonic()
+    with _lock:
+        failures = _recent_failures(username, now)
+        if not failures or len(failures) < config.LOGIN_MAX_FAILURES:
+            return 0
+        return int(failures[0] + config.LOGIN_FAILURE_WINDOW_S - now) + 1
+
+def record_login(username, success):
+    now = time.monotonic()
+    with _lock:
+        if success:
+            _failures.pop(username, None)
+            return
+        failures = _failures.pop(username, None) or deque()
+        failures.append(now)
+        _failures[username] = failures
+        # From the least recently failed: forget usernames whose failures
+        # have all expired, and beyond LOGIN_TRACKED_USERNAMES any others
+        while _failures:
+            name, oldest = next(iter(_failures.items()))
+            if oldest[-1] > now - config.LOGIN_FAILURE_WINDOW_S and len(_failures) <= config.LOGIN_TRACKED_USERNAMES:
+                break
+            del _failures[name]
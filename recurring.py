@@ -0,0 +1,187 @@
+import calendar
+import threading
+from datetime import date, datetime, timedelta
+
+import config
+from cache import invalidate_user
+from connection import get_connection
+from lookups import category_id, parse_tags, set_tags
+from money import to_minor
+from writer import write
+
+RECURRENCES = ['Daily', 'Weekly', 'Monthly', 'Yearly']
+
+# Occurrences materialized per rule in one transaction, so a long-running
+# daily rule catches up in bounded steps instead of one huge write
+MATERIALIZE_BATCH = 1000
+
+def create_recurring_rules(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recurring_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            type TEXT NOT NULL,
+            tags TEXT,
+            recurrence TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            occurrences_done INTEGER NOT NULL DEFAULT 0,
+            next_date TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_recurring_rules_next_date ON recurring_rules (next_date)')
+    conn.execute('ALTER TABLE expenses ADD COLUMN recurring_rule_id INTEGER REFERENCES recurring_rules (id)')
+    # One expense per rule and occurrence date, which makes materializing
+    # idempotent even if two processes race on the same rule
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_recurring_occurrence
+        ON expenses (recurring_rule_id, date) WHERE recurring_rule_id IS NOT NULL
+    ''')
+
+def occurrence(start, recurrence, n):
+    # The n-th occurrence (0-based) counted from the start date, so monthly
+    # and yearly rules keep their day of month instead of drifting after a
+    # short month (Jan 31 -> Feb 29 -> Mar 31)
+    if recurrence == 'Daily':
+        return start + timedelta(days=n)
+    if recurrence == 'Weekly':
+        return start + timedelta(weeks=n)
+    if recurrence == 'Monthly':
+        months = start.month - 1 + n
+        year, month = start.year + months // 12, months % 12 + 1
+    elif recurrence == 'Yearly':
+        year, month = start.year + n, start.month
+    else:
+        raise ValueError(f"Unknown recurrence: {recurrence}")
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+def add_recurring_rule(user_id, amount, category, description, start_date, end_date, recurrence, trans_type, tags=None,
+                       idempotency_key=None):
+    # Save the rule and materialize what is already due, which includes the
+    # first occurrence when it starts today or earlier. Returns 'created',
+    # 'duplicate' when idempotency_key was already used, or False on error.
+    try:
+        if recurrence not in RECURRENCES:
+            raise ValueError(f"Unknown recurrence: {recurrence}")
+        created = write(lambda conn: conn.execute('''
+            INSERT INTO recurring_rules
+                (user_id, amount, category, description, type, tags, recurrence, start_date, end_date, next_date,
+                 idempotency_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING
+        ''', (user_id, to_minor(amount), category, description, trans_type, tags, recurrence,
+              start_date.strftime('%Y-%m-%d'),
+              end_date.strftime('%Y-%m-%d') if end_date else None,
+              start_date.strftime('%Y-%m-%d'),
+              idempotency_key)).rowcount)
+        if not created:
+            return 'duplicate'
+        # Write the first batch now and leave any backlog to the scheduler
+        materialize_due(user_id=user_id, max_passes=1)
+        _wake.set()
+        return 'created'
+    except Exception as e:
+        print(f"Error adding recurring transaction: {str(e)}")
+        return False
+
+def _materialize_rule(conn, rule, until):
+    (rule_id, user_id, amount, category, description, trans_type, tags,
+     recurrence, start_date, end_date, done) = rule
+    start = date.fromisoformat(start_date)
+    if end_date:
+        until = min(until, date.fromisoformat(end_date))
+
+    category = category_id(conn, category)
+    rows = []
+    n = done
+    while len(rows) < MATERIALIZE_BATCH:
+        day = occurrence(start, recurrence, n)
+        if day > until:
+            break
+        rows.append((user_id, amount, category, description, day.strftime('%Y-%m-%d'), trans_type, rule_id))
+        n += 1
+
+    conn.executemany('''
+        INSERT OR IGNORE INTO expenses (user_id, amount, category_id, description, date, type, recurring_rule_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    if rows and parse_tags(tags):
+        written = conn.execute('''
+            SELECT id FROM expenses WHERE recurring_rule_id = ? AND date >= ? AND date <= ?
+        ''', (rule_id, rows[0][4], rows[-1][4])).fetchall()
+        set_tags(conn, [(expense_id, tags) for (expense_id,) in written])
+    # Advance the high-water mark past everything just written
+    conn.execute('''
+        UPDATE recurring_rules SET occurrences_done = ?, next_date = ? WHERE id = ?
+    ''', (n, occurrence(start, recurrence, n).strftime('%Y-%m-%d'), rule_id))
+    return len(rows)
+
+def materialize_due(today=None, user_id=None, max_passes=None):
+    # Expand every rule with occurrences up to today into expenses, one
+    # batch per rule per pass. Returns the number of occurrences written.
+    today = today or datetime.now().date()
+    query = '''
+        SELECT id, user_id, amount, category, description, type, tags,
+               recurrence, start_date, end_date, occurrences_done
+        FROM recurring_rules
+        WHERE next_date <= ? AND (end_date IS NULL OR next_date <= end_date)
+    '''
+    params = [today.strftime('%Y-%m-%d')]
+    if user_id is not None:
+        query += ' AND user_id = ?'
+        params.append(user_id)
+
+    total = 0
+    touched = set()
+    passes = 0
+    with get_connection() as conn:
+        while max_passes is None or passes < max_passes:
+            passes += 1
+            rules = conn.execute(query, params).fetchall()
+            if not rules:
+                break
+            for rule in rules:
+                written = _materialize_rule(conn, rule, today)
+                conn.commit()
+                total += written
+                touched.add(rule[1])
+
+    for uid in touched:
+        invalidate_user(uid)
+    return total
+
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+_wake = threading.Event()
+
+def _run_scheduler(interval):
+    while True:
+        # Cleared before the pass, so a rule added during it wakes the
+        # next wait instead of being lost
+        _wake.clear()
+        try:
+            materialize_due()
+        except Exception as e:
+            print(f"Error materializing recurring transactions: {str(e)}")
+        # Sleep until the next pass, or until a new rule has a backlog
+        _wake.wait(interval)
+
+def start_scheduler(interval=None):
+    # Start the background materializer once per process; safe to call on
+    # every script run
+    global _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return
+        _scheduler_started = True
+    thread = threading.Thread(
+        target=_run_scheduler,
+        args=(interval or config.RECURRING_INTERVAL_S,),
+        name='recurring-materializer',
+        daemon=True
+    )
+    thread.start()
@@ -0,0 +1,217 @@
+import argparse
+
+# Per-user summary tables, kept in step with `expenses` by triggers so that
+# every writer (single inserts, bulk edits, deletes) maintains them in the
+# same transaction. Dashboard charts read these instead of raw rows.
+# Totals are integer paise, like expenses.amount.
+#
+# Being derived data, the rollups are not part of the numbered schema
+# migrations: ensure_rollups() drops and rebuilds them whenever
+# ROLLUP_VERSION changes.
+ROLLUP_VERSION = 2
+
+ROLLUP_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS user_daily_totals (
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        type TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, day, type)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS user_monthly_category_totals (
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category_id INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, month, type, category_id)
+    ) WITHOUT ROWID
+    '''
+]
+
+# Statements adding (+) or removing (-) one expense row from the rollups,
+# written against the trigger's NEW/OLD row
+_ADD_ROW = '''
+    INSERT INTO user_daily_totals (user_id, day, type, total, count)
+    VALUES ({row}.user_id, substr({row}.date, 1, 10), {row}.type, {row}.amount, 1)
+    ON CONFLICT (user_id, day, type) DO UPDATE
+    SET total = total + excluded.total, count = count + 1;
+
+    INSERT INTO user_monthly_category_totals (user_id, month, type, category_id, total, count)
+    VALUES ({row}.user_id, substr({row}.date, 1, 7), {row}.type, {row}.category_id, {row}.amount, 1)
+    ON CONFLICT (user_id, month, type, category_id) DO UPDATE
+    SET total = total + excluded.total, count = count + 1;
+'''
+
+_REMOVE_ROW = '''
+    UPDATE user_daily_totals
+    SET total = total - {row}.amount, count = count - 1
+    WHERE user_id = {row}.user_id AND day = substr({row}.date, 1, 10) AND type = {row}.type;
+
+    DELETE FROM user_daily_totals
+    WHERE user_id = {row}.user_id AND day = substr({row}.date, 1, 10) AND type = {row}.type
+    AND count <= 0;
+
+    UPDATE user_monthly_category_totals
+    SET total = total - {row}.amount, count = count - 1
+    WHERE user_id = {row}.user_id AND month = substr({row}.date, 1, 7)
+    AND type = {row}.type AND category_id = {row}.category_id;
+
+    DELETE FROM user_monthly_category_totals
+    WHERE user_id = {row}.user_id AND month = substr({row}.date, 1, 7)
+    AND type = {row}.type AND category_id = {row}.category_id AND count <= 0;
+'''
+
+ROLLUP_TRIGGER_NAMES = ['expenses_rollup_insert', 'expenses_rollup_delete', 'expenses_rollup_update']
+
+ROLLUP_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS expenses_rollup_insert AFTER INSERT ON expenses
+    BEGIN
+        {_ADD_ROW.format(row='NEW')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS expenses_rollup_delete AFTER DELETE ON expenses
+    BEGIN
+        {_REMOVE_ROW.format(row='OLD')}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS expenses_rollup_update
+    AFTER UPDATE OF user_id, amount, category_id, date, type ON expenses
+    BEGIN
+        {_REMOVE_ROW.format(row='OLD')}
+        {_ADD_ROW.format(row='NEW')}
+    END
+    '''
+]
+
+def create_rollups(conn):
+    for statement in ROLLUP_TABLES + ROLLUP_TRIGGERS:
+        conn.execute(statement)
+    rebuild_rollups(conn)
+
+def drop_rollups(conn):
+    for trigger in ROLLUP_TRIGGER_NAMES:
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute('DROP TABLE IF EXISTS user_daily_totals')
+    conn.execute('DROP TABLE IF EXISTS user_monthly_category_totals')
+
+def ensure_rollups(conn):
+    # Bring the rollups up to ROLLUP_VERSION, rebuilding them from expenses
+    # if their definition changed or any of their triggers is missing (a
+    # migration that rebuilt the expenses table drops them with it). Runs
+    # inside the caller's transaction.
+    conn.execute('CREATE TABLE IF NOT EXISTS rollup_version (version INTEGER NOT NULL)')
+    row = conn.execute('SELECT version FROM rollup_version').fetchone()
+    triggers = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join('?' * len(ROLLUP_TRIGGER_NAMES))})",
+        ROLLUP_TRIGGER_NAMES
+    ).fetchone()[0]
+    if row and row[0] == ROLLUP_VERSION and triggers == len(ROLLUP_TRIGGER_NAMES):
+        return
+    drop_rollups(conn)
+    create_rollups(conn)
+    conn.execute('DELETE FROM rollup_version')
+    conn.execute('INSERT INTO rollup_version (version) VALUES (?)', (ROLLUP_VERSION,))
+
+def _user_filter(user_id):
+    if user_id is None:
+        return '', ()
+    return ' WHERE user_id = ?', (user_id,)
+
+def rebuild_rollups(conn, user_id=None):
+    where, params = _user_filter(user_id)
+    conn.execute('DELETE FROM user_daily_totals' + where, params)
+    conn.execute('DELETE FROM user_monthly_category_totals' + where, params)
+    conn.execute('''
+        INSERT INTO user_daily_totals (user_id, day, type, total, count)
+        SELECT user_id, substr(date, 1, 10), type, SUM(amount), COUNT(*)
+        FROM expenses''' + where + '''
+        GROUP BY 1, 2, 3
+    ''', params)
+    conn.execute('''
+        INSERT INTO user_monthly_category_totals (user_id, month, type, category_id, total, count)
+        SELECT user_id, substr(date, 1, 7), type, category_id, SUM(amount), COUNT(*)
+        FROM expenses''' + where + '''
+        GROUP BY 1, 2, 3, 4
+    ''', params)
+
+def add_to_rollups(conn, first_id):
+    # Fold expenses with id >= first_id into the rollups in two grouped
+    # upserts, for bulk writers that insert with the rollup triggers
+    # suspended
+    conn.execute('''
+        INSERT INTO user_daily_totals (user_id, day, type, total, count)
+        SELECT user_id, substr(date, 1, 10), type, SUM(amount), COUNT(*)
+        FROM expenses WHERE id >= ?
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, day, type) DO UPDATE
+        SET total = total + excluded.total, count = count + excluded.count
+    ''', (first_id,))
+    conn.execute('''
+        INSERT INTO user_monthly_category_totals (user_id, month, type, category_id, total, count)
+        SELECT user_id, substr(date, 1, 7), type, category_id, SUM(amount), COUNT(*)
+        FROM expenses WHERE id >= ?
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (user_id, month, type, category_id) DO UPDATE
+        SET total = total + excluded.total, count = count + excluded.count
+    ''', (first_id,))
+
+def verify_rollups(conn, user_id=None):
+    # Recompute both rollups from `expenses` and return the keys whose
+    # stored totals or counts disagree (empty list when consistent)
+    where, params = _user_filter(user_id)
+    checks = [
+        ('user_daily_totals', 'user_id, day, type',
+         'SELECT user_id, substr(date, 1, 10) AS day, type, SUM(amount) AS total, COUNT(*) AS count '
+         'FROM expenses' + where + ' GROUP BY 1, 2, 3'),
+        ('user_monthly_category_totals', 'user_id, month, type, category_id',
+         'SELECT user_id, substr(date, 1, 7) AS month, type, category_id, SUM(amount) AS total, COUNT(*) AS count '
+         'FROM expenses' + where + ' GROUP BY 1, 2, 3, 4')
+    ]
+
+    mismatches = []
+    for table, keys, expected in checks:
+        stored = f'SELECT * FROM {table}' + where
+        join = ' AND '.join(f's.{k} = e.{k}' for k in keys.split(', '))
+        # SQLite has no FULL OUTER JOIN, so check each direction separately
+        rows = conn.execute(f'''
+            SELECT {', '.join('e.' + k for k in keys.split(', '))}, e.total, s.total
+            FROM ({expected}) e LEFT JOIN ({stored}) s ON {join}
+            WHERE s.total IS NULL OR s.total != e.total OR s.count != e.count
+            UNION ALL
+            SELECT {', '.join('s.' + k for k in keys.split(', '))}, e.total, s.total
+            FROM ({stored}) s LEFT JOIN ({expected}) e ON {join}
+            WHERE e.total IS NULL
+        ''', params * 4).fetchall()
+        mismatches.extend((table,) + row for row in rows)
+    return mismatches
+
+def main():
+    from connection import get_connection
+
+    parser = argparse.ArgumentParser(description='Rebuild or verify the expense rollup tables')
+    parser.add_argument('command', choices=['rebuild', 'verify'])
+    parser.add_argument('--user-id', type=int, default=None, help='Limit to a single user')
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        if args.command == 'rebuild':
+            rebuild_rollups(conn, args.user_id)
+            print('Rollups rebuilt')
+        else:
+            mismatches = verify_rollups(conn, args.user_id)
+            for mismatch in mismatches:
+                print('Mismatch:', mismatch)
+            print(f'{len(mismatches)} mismatched rollup rows')
+            raise SystemExit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
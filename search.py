@@ -0,0 +1,87 @@
+import re
+
+# Full-text index over each expense's description, category name and tag
+# names, rowid = expenses.id. Triggers on expenses and transaction_tags keep
+# it in step with every writer, like the rollups.
+SEARCH_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS expense_search USING fts5 (
+        description, category, tags,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+'''
+
+_EXPENSE_TAGS = '''
+    (SELECT group_concat(t.name, ' ')
+     FROM transaction_tags tt JOIN tags t ON t.id = tt.tag_id
+     WHERE tt.expense_id = {expense_id})
+'''
+
+SEARCH_TRIGGER_NAMES = [
+    'expenses_search_insert', 'expenses_search_update', 'expenses_search_delete',
+    'transaction_tags_search_insert', 'transaction_tags_search_delete'
+]
+
+SEARCH_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS expenses_search_insert AFTER INSERT ON expenses
+    BEGIN
+        INSERT INTO expense_search (rowid, description, category, tags)
+        VALUES (NEW.id, NEW.description, (SELECT name FROM categories WHERE id = NEW.category_id), NULL);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS expenses_search_update
+    AFTER UPDATE OF description, category_id ON expenses
+    BEGIN
+        UPDATE expense_search
+        SET description = NEW.description,
+            category = (SELECT name FROM categories WHERE id = NEW.category_id)
+        WHERE rowid = NEW.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS expenses_search_delete AFTER DELETE ON expenses
+    BEGIN
+        DELETE FROM expense_search WHERE rowid = OLD.id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS transaction_tags_search_insert AFTER INSERT ON transaction_tags
+    BEGIN
+        UPDATE expense_search SET tags = {_EXPENSE_TAGS.format(expense_id='NEW.expense_id')}
+        WHERE rowid = NEW.expense_id;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS transaction_tags_search_delete AFTER DELETE ON transaction_tags
+    BEGIN
+        UPDATE expense_search SET tags = {_EXPENSE_TAGS.format(expense_id='OLD.expense_id')}
+        WHERE rowid = OLD.expense_id;
+    END
+    '''
+]
+
+def create_search_index(conn):
+    conn.execute(SEARCH_TABLE)
+    conn.execute('DELETE FROM expense_search')
+    index_expenses(conn)
+    for statement in SEARCH_TRIGGERS:
+        conn.execute(statement)
+
+def index_expenses(conn, first_id=0):
+    # Add expenses with id >= first_id, tags included, in one statement; for
+    # bulk writers that insert with the search triggers suspended
+    conn.execute(f'''
+        INSERT INTO expense_search (rowid, description, category, tags)
+        SELECT e.id, e.description, c.name, {_EXPENSE_TAGS.format(expense_id='e.id')}
+        FROM expenses e JOIN categories c ON c.id = e.category_id
+        WHERE e.id >= ?
+    ''', (first_id,))
+
+def match_query(text):
+    # Free text -> FTS5 query: every word must match, as a prefix, so
+    # "groc sup" finds "Grocery supplies". Words are quoted, which keeps
+    # FTS5 operators and punctuation in user input from being parsed.
+    words = re.findall(r'\w+', text or '')
+    return ' '.join(f'"{word}"*' for word in words) or None
@@ -0,0 +1,86 @@
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules each page loads on first use, on top of what main_app imports
+PAGE_MODULES = {
+    'Dashboard': ['helper'],
+    'Manage Transactions': ['ledger', 'export'],
+    'Import Transactions': ['importer']
+}
+
+def startup_modules(path=os.path.join(APP_DIR, 'main_app.py')):
+    # Modules main_app.py imports at module level, i.e. on every cold start
+    modules = []
+    for node in ast.parse(open(path).read()).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def import_times(modules, preloaded=()):
+    # Import `modules` in a fresh interpreter with -X importtime, after
+    # `preloaded`, and return {module: cumulative microseconds} for every
+    # module that was imported by `modules` themselves
+    code = ''.join(f'import {module}\n' for module in preloaded)
+    code += 'import sys; sys.stderr.write("--- start\\n")\n'
+    code += ''.join(f'import {module}\n' for module in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=APP_DIR, check=True
+    )
+    times = {}
+    started = False
+    for line in result.stderr.splitlines():
+        if line == '--- start':
+            started = True
+        elif started and line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+def _best_of(repeat, modules, preloaded=()):
+    # Lowest time per module over `repeat` runs, to filter out noise
+    best = {}
+    for _ in range(repeat):
+        for name, us in import_times(modules, preloaded).items():
+            best[name] = min(us, best.get(name, us))
+    return best
+
+def _report(title, modules, times, top):
+    total = sum(times.get(module, 0) for module in modules)
+    print(f'\n{title}: {total / 1000:.1f} ms')
+    for module in modules:
+        print(f'  {module:<32} {times.get(module, 0) / 1000:8.1f} ms')
+    # Heaviest packages pulled in along the way, by their slowest module
+    packages = {}
+    for name, us in times.items():
+        package = name.split('.')[0]
+        if package not in modules:
+            packages[package] = max(us, packages.get(package, 0))
+    heaviest = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    if heaviest:
+        print('  heaviest dependencies:')
+        for package, us in heaviest:
+            print(f'    {package:<30} {us / 1000:8.1f} ms')
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import time per module for a cold start and each page')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, the fastest is reported')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest dependencies to list')
+    args = parser.parse_args()
+
+    modules = startup_modules()
+    _report('Cold start (main_app imports)', modules, _best_of(args.repeat, modules), args.top)
+    for page, page_modules in PAGE_MODULES.items():
+        _report(f'{page} page, first visit', page_modules,
+                _best_of(args.repeat, page_modules, preloaded=modules), args.top)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import json
+import re
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import config
+
+# Colours of each theme, as CSS variables the stylesheet refers to
+THEMES = {
+    'dark': {
+        'background': 'linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%)',
+        'surface': 'linear-gradient(145deg, #2d2d2d 0%, #1a1a1a 100%)',
+        'input': '#2d2d2d',
+        'border': '#404040',
+        'text': '#ffffff',
+        'subtle-text': '#a29bfe',
+        'accent': 'linear-gradient(45deg, #6c5ce7, #a29bfe)',
+        'accent-hover': 'linear-gradient(45deg, #a29bfe, #6c5ce7)',
+        'focus': '#6c5ce7',
+        'focus-ring': 'rgba(108, 92, 231, 0.3)',
+        'shadow': 'rgba(0, 0, 0, 0.3)',
+        'success': '#00b894',
+        'error': '#e57373'
+    },
+    'light': {
+        'background': '#f8f9fa',
+        'surface': '#ffffff',
+        'input': '#ffffff',
+        'border': '#dee2e6',
+        'text': '#2c3e50',
+        'subtle-text': '#6c757d',
+        'accent': '#3498db',
+        'accent-hover': '#2980b9',
+        'focus': '#3498db',
+        'focus-ring': 'rgba(52, 152, 219, 0.3)',
+        'shadow': 'rgba(0, 0, 0, 0.1)',
+        'success': '#28a745',
+        'error': '#dc3545'
+    }
+}
+
+# Every page's styles, in one sheet
+_STYLES = '''
+    .stApp {
+        background: var(--background);
+        color: var(--text);
+    }
+
+    h1 {
+        border-bottom: 3px solid var(--focus);
+        padding-bottom: 0.3em;
+    }
+
+    /* Page containers and cards */
+    .auth-container, .transaction-container {
+        margin: 0 auto;
+        padding: 30px;
+        border-radius: 15px;
+        box-shadow: 0 8px 16px var(--shadow);
+        background: var(--surface);
+        border: 1px solid var(--border);
+    }
+    .auth-container { max-width: 400px; }
+    .transaction-container { max-width: 800px; }
+    .manage-container, .dashboard-container {
+        max-width: 1200px;
+        margin: 0 auto;
+        padding: 20px;
+    }
+
+    .summary-card, .metric-card, .chart-container, .transaction-table, .filter-section {
+        background: var(--surface);
+        border-radius: 10px;
+        padding: 15px;
+        box-shadow: 0 4px 6px var(--shadow);
+        border: 1px solid var(--border);
+        margin-bottom: 20px;
+    }
+    .chart-container, .transaction-table, .filter-section { padding: 20px; }
+    .summary-card { transition: all 0.3s ease; }
+    .summary-card:hover {
+        transform: translateY(-5px);
+        box-shadow: 0 6px 12px var(--shadow);
+    }
+
+    .recurring-section {
+        background: var(--input);
+        padding: 15px;
+        border-radius: 8px;
+        margin-bottom: 20px;
+    }
+    .tags-input { margin-bottom: 20px; }
+
+    /* Titles */
+    .auth-title, .transaction-title, .dashboard-title {
+        text-align: center;
+        color: var(--text);
+        margin-bottom: 30px;
+        background: var(--accent);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+    }
+    .auth-title {
+        font-size: 2em;
+        font-weight: bold;
+    }
+    .auth-subtitle {
+        text-align: center;
+        color: var(--subtle-text);
+        margin-bottom: 30px;
+        font-size: 1.1em;
+    }
+    .auth-footer {
+        text-align: center;
+        margin-top: 30px;
+        color: var(--subtle-text);
+        font-size: 0.9em;
+    }
+
+    /* Login and register tabs */
+    .stTabs [data-baseweb="tab-list"] { gap: 50px; }
+    .stTabs [data-baseweb="tab"] {
+        padding: 10px 20px;
+        font-size: 1.1em;
+        font-weight: 500;
+    }
+
+    .password-requirements {
+        font-size: 0.85em;
+        color: var(--subtle-text);
+        margin-top: 5px;
+        padding: 10px;
+        background: var(--input);
+        border-radius: 5px;
+        border: 1px solid var(--border);
+    }
+    .password-requirements ul {
+        margin: 5px 0;
+        padding-left: 20px;
+    }
+    .password-requirements li { margin-bottom: 5px; }
+    .password-requirements .valid { color: var(--success); }
+    .password-requirements .invalid { color: var(--error); }
+
+    /* Widgets */
+    .stButton > button {
+        background: var(--accent);
+        color: white;
+        border: none;
+        border-radius: 8px;
+        padding: 10px 20px;
+        font-weight: bold;
+        transition: all 0.3s ease;
+    }
+    .stButton > button:hover {
+        background: var(--accent-hover);
+        transform: translateY(-2px);
+        box-shadow: 0 4px 8px var(--shadow);
+    }
+
+    .stTextInput > div > div > input,
+    .stNumberInput > div > div > input,
+    .stSelectbox > div > div > div {
+        background-color: var(--input);
+        border: 1px solid var(--border);
+        border-radius: 8px;
+        padding: 8px 12px;
+        transition: all 0.3s ease;
+        color: var(--text);
+    }
+    .stTextInput > div > div > input:focus,
+    .stNumberInput > div > div > input:focus,
+    .stSelectbox > div > div > div:focus {
+        border-color: var(--focus);
+        box-shadow: 0 0 0 2px var(--focus-ring);
+    }
+
+    .stRadio > div, .stCheckbox > div {
+        background-color: var(--input);
+        border-radius: 8px;
+        padding: 10px;
+        border: 1px solid var(--border);
+    }
+
+    .stMarkdown, .stText, .stNumberInput > label, .stTextInput > label, .stSelectbox > label {
+        color: var(--text) !important;
+    }
+
+    .stDataFrame {
+        background-color: var(--input);
+        border-radius: 10px;
+        box-shadow: 0 4px 6px var(--shadow);
+        border: 1px solid var(--border);
+    }
+
+    [data-testid="stSidebar"] {
+        background: var(--background);
+        color: var(--text);
+        border-right: 1px solid var(--border);
+    }
+
+    .stAlert {
+        border-radius: 10px;
+        padding: 15px;
+        margin: 10px 0;
+    }
+'''
+
+def _variables(selector, colours):
+    return selector + '{' + ''.join(f'--{name}:{value};' for name, value in colours.items()) + '}'
+
+def _minify(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).strip()
+
+# Built once per process: both themes' variables, switched by an attribute
+# on the page's root element, followed by the shared rules
+STYLESHEET = _minify(
+    _variables(':root', THEMES[config.THEME])
+    + ''.join(_variables(f':root[data-expense-theme="{name}"]', colours) for name, colours in THEMES.items())
+    + _STYLES
+)
+
+# The component iframe is same-origin, so its script can add the stylesheet
+# to the app page's <head>, where it stays for the rest of the session
+_INSTALL = '''<script>
+const doc = window.parent.document;
+let style = doc.getElementById('expense-theme');
+if (!style) {
+    style = doc.createElement('style');
+    style.id = 'expense-theme';
+    doc.head.appendChild(style);
+}
+style.textContent = %s;
+doc.documentElement.dataset.expenseTheme = %s;
+</script>'''
+
+_SWITCH = '<script>window.parent.document.documentElement.dataset.expenseTheme = %s;</script>'
+
+def apply_theme(name):
+    # Send the stylesheet on the session's first run only, and afterwards
+    # just the theme name when it changes; other reruns emit nothing
+    applied = st.session_state.get('applied_theme')
+    if applied == name:
+        return
+    if applied is None:
+        script = _INSTALL % (json.dumps(STYLESHEET).replace('</', '<\\/'), json.dumps(name))
+    else:
+        script = _SWITCH % json.dumps(name)
+    components.html(script, height=0)
+    st.session_state['applied_theme'] = name
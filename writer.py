@@ -0,0 +1,107 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import config
+from connection import get_connection
+
+# Writes from every session are run by one background thread, which commits
+# whatever has queued up meanwhile as one transaction (group commit). Each
+# write runs in its own savepoint, so a write that fails is rolled back on
+# its own and only its caller sees the error.
+_queue = queue.Queue(maxsize=config.WRITE_QUEUE_SIZE)
+_started = False
+_start_lock = threading.Lock()
+_stats = {'writes': 0, 'groups': 0, 'failed': 0}
+
+def submit(job, after_commit=None):
+    # Queue job(conn) and return a Future for its result, resolved once the
+    # transaction it ran in has committed. Jobs must not commit themselves.
+    # after_commit(result), if given, runs on the writer thread between the
+    # commit and resolving the future.
+    _start()
+    future = Future()
+    try:
+        _queue.put((job, after_commit, future), timeout=config.WRITE_TIMEOUT_S)
+    except queue.Full:
+        raise sqlite3.OperationalError('timed out waiting for space in the write queue')
+    return future
+
+def write(job, after_commit=None):
+    # submit() and wait for the committed result. A write still queued after
+    # WRITE_TIMEOUT_S is cancelled and reported as failed; one the writer
+    # has already started will commit, so wait for it rather than report a
+    # failure for a write that went through.
+    future = submit(job, after_commit)
+    try:
+        return future.result(timeout=config.WRITE_TIMEOUT_S)
+    except FutureTimeout:
+        if future.cancel():
+            raise sqlite3.OperationalError(f'timed out after {config.WRITE_TIMEOUT_S}s waiting for the writer')
+        return future.result()
+
+def _take_group():
+    group = [_queue.get()]
+    deadline = time.monotonic() + config.WRITE_GROUP_WINDOW_MS / 1000
+    while len(group) < config.WRITE_GROUP_MAX:
+        try:
+            group.append(_queue.get(timeout=max(deadline - time.monotonic(), 0)))
+        except queue.Empty:
+            break
+    # Skip writes whose callers cancelled them while they were queued
+    return [item for item in group if item[2].set_running_or_notify_cancel()]
+
+def _run_group(group):
+    results = []
+    try:
+        with get_connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for job, _, _ in group:
+                conn.execute('SAVEPOINT write')
+                try:
+                    results.append((job(conn), None))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write')
+                    results.append((None, e))
+                conn.execute('RELEASE write')
+    except Exception as e:
+        # Nothing was committed
+        for _, _, future in group:
+            future.set_exception(e)
+        _stats['failed'] += len(group)
+        return
+
+    _stats['groups'] += 1
+    _stats['writes'] += len(group)
+    for (_, after_commit, future), (result, error) in zip(group, results):
+        if error is None and after_commit is not None:
+            try:
+                after_commit(result)
+            except Exception as e:
+                error = e
+        if error is None:
+            future.set_result(result)
+        else:
+            _stats['failed'] += 1
+            future.set_exception(error)
+
+def _run():
+    while True:
+        group = _take_group()
+        if group:
+            _run_group(group)
+
+def _start():
+    global _started
+    if _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        threading.Thread(target=_run, name='db-writer', daemon=True).start()
+        _started = True
+
+def writer_stats():
+    return dict(_stats, queued=_queue.qsize())